@@ -1,12 +1,10 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
-import ta
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta, date
 import matplotlib.pyplot as plt
-from ta.trend import ADXIndicator
 #from ta.momentum import TRIXIndicator
 # from .py imports
 #-- Volledige tickerlijsten ---
@@ -15,75 +13,53 @@ from tickers import (
     nasdaq_tickers, ustech_tickers, crypto_tickers,
     tabs_mapping, tab_labels, valutasymbool
 )
-# Indicatoren berekening
-from sam_indicator import calculate_sam
-from sat_indicator import calculate_sat
+# Advies en indicatoren
+from advies import adviesraster, kies_advies, DREMPELS, ADVIES_VERSIE
+# SAM + SAT per ticker/interval, sleutel = vingerafdruk van de bars (geen hash van de hele DataFrame)
+from indicatorcache import indicatoren, INDICATOR_VERSIE
 # grafieken en tabellen
 from grafieken import plot_koersgrafiek, plot_sam_trend, plot_sat_debug, bepaal_grafiekperiode 
 # trading bot
 from bot import toon_trading_bot_interface
 from bot import verbind_met_alpaca, haal_laatste_koers, plaats_order, sluit_positie
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
+# lokale bar-opslag met incrementele downloads
+from koersopslag import MIN_BARS, bepaal_periode, haal_interval_bars, laad_markt, schoon_bars
+# gedeeld koersbord (achtergrond ververst)
+from koersbord import registreer_markt, lees_markt, laatste_koers
+# grovere intervallen lokaal afleiden (4h uit 1h, 1wk/1mo uit 1d)
+from herbemonstering import BASIS_INTERVAL
+# status per symbool (negatieve cache)
+from symboolstatus import gezondheid
+# cache-geldigheid op basis van handelstijden en bargrenzen
+from marktklok import geldig_tot
+# begrensde LRU-cache per laag (bars, indicatoren, advies)
+from cachelaag import begrensde_cache, statistieken as cache_statistieken
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
 #import alpaca_trade_api as tradeapi
 
 #--- Functie om data op te halen ---
-# ✅ Gecachete downloadfunctie (15 minuten geldig)
-@st.cache_data(ttl=900)
-def fetch_data_cached(ticker, interval, period):
-    return yf.download(ticker, interval=interval, period=period)
-
-# ✅ Weighted Moving Average functie
-def weighted_moving_average(series, window):
-    weights = np.arange(1, window + 1)
-    return series.rolling(window).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+# ✅ Gecachete downloadfunctie, haalt alleen nieuwe bars op
+# geldig_tot (marktklok) wordt bij het item bewaard: na een bargrens of opening wordt het item ververst
+@begrensde_cache("bars", geldigheid="geldig_tot")
+def fetch_data_cached(ticker, interval, period, geldig_tot=None):
+    return haal_interval_bars(ticker, interval, period)
 
 # ✅ Wrapper-functie met dataschoonmaak en fallback
 def fetch_data(ticker, interval):
-    # 🔁 Interval naar periode
-    if interval == "15m":
-        period = "30d"
-    elif interval == "1h":
-        period = "720d"
-    elif interval == "4h":
-        period = "360d"
-    elif interval == "1d":
-        period = "20y"
-    elif interval == "1wk":
-        period = "20y"
-    elif interval == "1mo":
-        period = "25y"
-    else:
-        period = "25y"  # fallback
+    period = bepaal_periode(interval)
 
     # ⬇️ Ophalen via gecachete functie
-    df = fetch_data_cached(ticker, interval, period)
-
-    # 🛡️ Check op geldige data
-    if df.empty or "Close" not in df.columns or "Open" not in df.columns:
-        return pd.DataFrame()
-
-    # 🧹 Verwijder irrelevante of foutieve rijen
-    df = df[
-        (df["Volume"] > 0) &
-        ((df["Open"] != df["Close"]) | (df["High"] != df["Low"]))
-    ]
+    df = fetch_data_cached(ticker, interval, period, geldig_tot(ticker, interval))
 
-    # 🕓 Zorg dat index datetime is
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index, errors="coerce")
-    df = df[~df.index.isna()]
-
-    # 🔁 Vul NaN's per kolom
-    for col in ["Close", "Open", "High", "Low", "Volume"]:
-        df[col] = df[col].fillna(method="ffill").fillna(method="bfill")
+    # 🧹 Verwijder irrelevante of foutieve rijen, datetime-index en NaN's per kolom gevuld
+    df = schoon_bars(df)
+    if df.empty:
+        return df
 
     # 🧪 Check minimale lengte
-    if len(df) < 30:
+    if len(df) < MIN_BARS:
         st.warning(f"⚠️ Slechts {len(df)} datapunten opgehaald — mogelijk te weinig voor indicatoren.")
         return pd.DataFrame()
 
@@ -128,117 +104,7 @@ def fetch_data(ticker, interval):
 
 
     
-def determine_advice(df, threshold, risk_aversion=0):
-    df = df.copy()
-
-    # ✅ Trendberekening over SAM
-    df["Trend"] = weighted_moving_average(df["SAM"], 12)
-    df["TrendChange"] = df["Trend"] - df["Trend"].shift(1)
-    df["Richting"] = np.sign(df["TrendChange"])
-    df["Trail"] = 0
-    df["Advies"] = np.nan
-
-    # ✅ Bereken Trail (opeenvolgende richting-versterking)
-    huidige_trend = 0
-    for i in range(1, len(df)):
-        huidige = df["Richting"].iloc[i]
-        vorige = df["Richting"].iloc[i - 1]
-
-        if huidige == vorige and huidige != 0:
-            huidige_trend += 1
-        elif huidige != 0:
-            huidige_trend = 1
-        else:
-            huidige_trend = 0
-
-        df.at[df.index[i], "Trail"] = huidige_trend
-
-    # ✅ Advieslogica
-    if risk_aversion == 0:
-        mask_koop = (df["Richting"] == 1) & (df["Trail"] >= threshold) & (df["Advies"].isna())
-        mask_verkoop = (df["Richting"] == -1) & (df["Trail"] >= threshold) & (df["Advies"].isna())
-
-        df.loc[mask_koop, "Advies"] = "Kopen"
-        df.loc[mask_verkoop, "Advies"] = "Verkopen"
-        df["Advies"] = df["Advies"].ffill()
-
-    elif risk_aversion == 1:
-        for i in range(2, len(df)):
-            trend_1 = df["SAT_Trend"].iloc[i]
-            trend_2 = df["SAT_Trend"].iloc[i - 1]
-            trend_3 = df["SAT_Trend"].iloc[i - 2]
-            stage_1 = df["SAT_Stage"].iloc[i]
-            stage_2 = df["SAT_Stage"].iloc[i - 1]
-            stage_3 = df["SAT_Stage"].iloc[i - 2]
-
-            if trend_1 >= trend_2 and trend_2 >= trend_3 and stage_1 > 0 and stage_2 > 0:
-                df.at[df.index[i], "Advies"] = "Kopen"
-            elif trend_1 < trend_2 and stage_1 < 0 and stage_2 < 0: # optie and trend_2 < trend_3 
-                df.at[df.index[i], "Advies"] = "Verkopen"
-
-        df["Advies"] = df["Advies"].ffill()
-
-    elif risk_aversion == 2:
-        for i in range(2, len(df)):
-            trend_1 = df["SAT_Trend"].iloc[i]
-            trend_2 = df["SAT_Trend"].iloc[i - 1]
-            trend_3 = df["SAT_Trend"].iloc[i - 2]
-            stage_1 = df["SAT_Stage"].iloc[i]
-            stage_2 = df["SAT_Stage"].iloc[i - 1]
-            stage_3 = df["SAT_Stage"].iloc[i - 2]
-            
-            if trend_1 > 0 and stage_1 > 0:
-                df.at[df.index[i], "Advies"] = "Kopen"
-            elif trend_1 < trend_2 and stage_1 < 0 and stage_2 < 0:
-                df.at[df.index[i], "Advies"] = "Verkopen"
-
-        df["Advies"] = df["Advies"].ffill()
-
-    # ✅ Bereken rendementen op basis van adviesgroepering
-    df["AdviesGroep"] = (df["Advies"] != df["Advies"].shift()).cumsum()
-    rendementen = []
-    sam_rendementen = []
-
-    groepen = list(df.groupby("AdviesGroep"))
-
-    for i in range(len(groepen)):
-        _, groep = groepen[i]
-        advies = groep["Advies"].iloc[0]
-
-        start = groep["Close"].iloc[0]
-        if i < len(groepen) - 1:
-            eind = groepen[i + 1][1]["Close"].iloc[0]
-        else:
-            eind = groep["Close"].iloc[-1]
-
-        try:
-            start = float(start)
-            eind = float(eind)
-            if start != 0.0:
-                markt_rendement = (eind - start) / start
-                sam_rendement = markt_rendement if advies == "Kopen" else -markt_rendement
-            else:
-                markt_rendement = 0.0
-                sam_rendement = 0.0
-        except Exception:
-            markt_rendement = 0.0
-            sam_rendement = 0.0
-
-        rendementen.extend([markt_rendement] * len(groep))
-        sam_rendementen.extend([sam_rendement] * len(groep))
-
-    if len(rendementen) != len(df):
-        raise ValueError(f"Lengte mismatch: rendementen={len(rendementen)}, df={len(df)}")
-
-    df["Markt-%"] = rendementen
-    df["SAM-%"] = sam_rendementen
-
-    if "Advies" in df.columns and df["Advies"].notna().any():
-        huidig_advies = df["Advies"].dropna().iloc[-1]
-    else:
-        huidig_advies = "Niet beschikbaar"
-
-    return df, huidig_advies
+# determine_advice, adviesraster en ADVIES_VERSIE staan in advies.py (ook gebruikt door sam_sweep.py)
 
             
        
@@ -311,23 +177,10 @@ valutasymbool = valutasymbool[selected_tab]
 
 #def get_live_ticker_data(tickers_dict):
 # --- Data ophalen voor dropdown live view ---
+# Leest uit het gedeelde koersbord; alleen tickers zonder koers worden (opnieuw) gedownload
 def get_live_ticker_data(tickers_dict):
-    tickers = list(tickers_dict.keys())
-    data = yf.download(tickers, period="1wk", interval="1wk", progress=False, group_by='ticker')
-    result = []
-
-    for ticker in tickers:
-        try:
-            last = data[ticker]['Close'].iloc[-1]
-            prev = data[ticker]['Open'].iloc[-1]
-            change = (last - prev) / prev * 100
-            kleur = "#00FF00" if change > 0 else "#FF0000" if change < 0 else "#808080"
-            naam = tickers_dict[ticker]
-            result.append((ticker, naam, last, change, kleur))
-        except Exception:
-            continue
-
-    return result
+    registreer_markt(tickers_dict)
+    return lees_markt(tickers_dict)
 
 # --- Weergave dropdown met live info ---
 live_info = get_live_ticker_data(tabs_mapping[selected_tab])
@@ -339,6 +192,12 @@ for t, naam, last, change, kleur in live_info:
     display = f"{t} - {naam} | {valutasymbool}{last:.2f} {emoji} {change:+.2f}%"
     dropdown_dict[t] = (display, naam)
 
+# --- Nog geen koersen (bv. download mislukt): tickers zonder koersinfo tonen i.p.v. een lege dropdown
+if not dropdown_dict:
+    st.warning("⚠️ Koersen konden niet worden opgehaald — tickers worden zonder koersinfo getoond.")
+    for t, naam in tabs_mapping[selected_tab].items():
+        dropdown_dict[t] = (f"{t} - {naam}", naam)
+
 # --- Bepalen van de juiste default key voor selectie
 # Herstel vorige selectie als deze nog bestaat
 default_ticker_key = st.session_state.get(f"ticker_select_{selected_tab}")
@@ -354,16 +213,18 @@ selected_ticker = st.selectbox(
     index=list(dropdown_dict.keys()).index(default_ticker_key)
 )
 
+# --- Symbolen waarvan het ophalen faalt (tijdelijk overgeslagen) ---
+status_symbolen = gezondheid()
+if not status_symbolen.empty:
+    with st.expander(f"🩺 {len(status_symbolen)} symbolen met ophaalfouten"):
+        st.dataframe(status_symbolen, use_container_width=True)
+
 # --- Ophalen ticker info ---
 ticker = selected_ticker
 ticker_name = dropdown_dict[ticker][1]
 
-# --- Live koers opnieuw ophalen voor de geselecteerde ticker ---
-try:
-    live_data = yf.download(ticker, period="1wk", interval="1wk", progress=False)
-    last = live_data["Close"].iloc[-1]
-except Exception:
-    last = 0.0  # fallback
+# --- Live koers voor de geselecteerde ticker uit het koersbord ---
+last = laatste_koers(ticker) or 0.0  # fallback
 
 # --- Andere instellingen ---
 # --- Intervalopties ---
@@ -382,6 +243,10 @@ interval_mapping = {
 }
 
 interval = interval_mapping[interval_optie]
+
+# 📦 Hele markt in één keer (gebundeld) in de bar-opslag zetten, wisselen van ticker kost dan geen download
+basis_interval = BASIS_INTERVAL.get(interval, interval)
+laad_markt(tickers, basis_interval, bepaal_periode(basis_interval))
 # -------
 
 # 📌 Titel SAM UITLEG als toggle (zelfde stijl als eerder)
@@ -428,29 +293,34 @@ col1, col2 = st.columns([1, 1])
 with col1:
     risk_aversion = st.slider("Mate van risk aversion", 0, 2, 1, step=1)
 with col2:
-    pass  # lege kolom, zodat slider links blijft
+    # Trail-drempel telt alleen bij risk aversion 0 (standaard 2)
+    threshold = st.select_slider("Trail-drempel", options=list(DREMPELS), value=2, disabled=risk_aversion != 0)
 
 # advies wordt geladen daarna
-@st.cache_data(ttl=900)
-def advies_wordt_geladen(ticker, interval, risk_aversion):
+# ✅ Het hele adviesraster (alle thresholds en risk aversions) wordt per ticker/interval één keer
+# berekend en gecachet; wisselen van gevoeligheid is daarna alleen nog een keuze uit het raster
+@begrensde_cache("advies", versie=f"{INDICATOR_VERSIE}.{ADVIES_VERSIE}", geldigheid="geldig_tot")
+def adviesraster_wordt_geladen(ticker, interval, geldig_tot=None):
     df = fetch_data(ticker, interval)
 
     if df is None or df.empty or "Close" not in df.columns:
         return None, None
 
-    # ✅ Altijd SAM en SAT berekenen
-    df = calculate_sam(df)
-    df = calculate_sat(df)
+    # ✅ Altijd SAM en SAT berekenen (SAM compact; bij alleen nieuwe bars worden alleen die doorgerekend)
+    df = indicatoren(ticker, interval, df)
 
-    # ✅ Advies bepalen
-    threshold = 2  # ← Default trail voor risk_aversion = 0
-    df, huidig_advies = determine_advice(df, threshold=threshold, risk_aversion=risk_aversion)
+    return adviesraster(df)
 
-    return df, huidig_advies
+
+def advies_wordt_geladen(ticker, interval, risk_aversion, threshold=2, geldig_tot=None):
+    basis, raster = adviesraster_wordt_geladen(ticker, interval, geldig_tot)
+    if basis is None:
+        return None, None
+    return kies_advies(basis, raster, risk_aversion, threshold)
     
 # ✅ Gebruik en foutafhandeling
 #df, huidig_advies = advies_wordt_geladen(ticker, interval, thresh, risk_aversion)
-df, huidig_advies = advies_wordt_geladen(ticker, interval, risk_aversion)
+df, huidig_advies = advies_wordt_geladen(ticker, interval, risk_aversion, threshold, geldig_tot(ticker, interval))
 # Keuze welke adviezen worden meegenomen in SAM-rendement
 signaalkeuze = st.radio(
     "Toon SAM-rendement voor:",
@@ -871,6 +741,10 @@ else:
     
 
 
+# 📦 Cachegebruik (geheugenbudget, hits/misses/evictions)
+with st.expander("📦 Cache-statistieken"):
+    st.dataframe(cache_statistieken(), use_container_width=True)
+
 # …na de adviezen en grafiek, etc.
 #toon_trading_bot_interface(selected_ticker, huidig_advies)
 toon_trading_bot_interface(selected_ticker, huidig_advies)
@@ -0,0 +1,136 @@
+# advies.py
+import numpy as np
+import pandas as pd
+from sam_indicator import weighted_moving_average
+
+#--- Advies en rendementen ---
+# 🔖 Verhoog bij elke wijziging in de adviesregels (gedeelde cache-sleutels)
+ADVIES_VERSIE = "2"
+
+# 🏷️ Advies als categorie: één byte per rij i.p.v. een Python-string (raster en cache houden er veel)
+ADVIES_CATEGORIE = pd.CategoricalDtype(["Kopen", "Verkopen"])
+
+
+# ✅ Trail (opeenvolgende richting-versterking) zonder rij-lus: per reeks gelijke richtingen
+# de positie binnen de reeks. Regels zoals de oorspronkelijke lus: rij 0 blijft 0, een richting
+# van 0 geeft 0, en NaN is nooit gelijk aan de vorige rij (dus telt steeds opnieuw vanaf 1).
+def _trail(richting):
+    trail = np.zeros(len(richting), dtype="int64")
+    if len(richting) < 2:
+        return trail
+    r = richting[1:]
+    nieuw = np.ones(len(r), dtype=bool)
+    nieuw[1:] = r[1:] != r[:-1]  # rij 1 begint altijd een reeks (de lus telt vanaf 0)
+    posities = np.arange(len(r))
+    begin = np.maximum.accumulate(np.where(nieuw, posities, 0))
+    trail[1:] = np.where(r != 0, posities - begin + 1, 0)
+    return trail
+
+# ✅ Gedeelde basis voor alle adviezen: Trend over SAM, richting en Trail
+def _trendbasis(df):
+    df = df.copy()
+    df["Trend"] = weighted_moving_average(df["SAM"], 12)
+    df["TrendChange"] = df["Trend"] - df["Trend"].shift(1)
+    df["Richting"] = np.sign(df["TrendChange"])
+    df["Trail"] = _trail(df["Richting"].to_numpy(dtype="float64"))
+    return df
+
+
+# ✅ Adviesreeks (object-array, doorgetrokken) voor één threshold en risk_aversion
+def _adviezen(basis, threshold, risk_aversion):
+    advies = np.full(len(basis), np.nan, dtype=object)
+
+    if risk_aversion == 0:
+        richting = basis["Richting"].to_numpy(dtype="float64")
+        genoeg = basis["Trail"].to_numpy() >= threshold
+        advies[(richting == 1) & genoeg] = "Kopen"
+        advies[(richting == -1) & genoeg] = "Verkopen"
+
+    elif risk_aversion in (1, 2):
+        # Regels per rij i >= 2 met de SAT-waarden van i, i-1 en i-2; "Kopen" gaat voor "Verkopen"
+        trend = basis["SAT_Trend"].to_numpy(dtype="float64")
+        stage = basis["SAT_Stage"].to_numpy(dtype="float64")
+        t1, t2, t3 = trend[2:], trend[1:-1], trend[:-2]
+        s1, s2 = stage[2:], stage[1:-1]
+
+        if risk_aversion == 1:
+            koop = (t1 >= t2) & (t2 >= t3) & (s1 > 0) & (s2 > 0)
+        else:
+            koop = (t1 > 0) & (s1 > 0)
+        verkoop = (t1 < t2) & (s1 < 0) & (s2 < 0)  # optie: & (t2 < t3)
+
+        advies[2:][verkoop] = "Verkopen"
+        advies[2:][koop] = "Kopen"
+
+    return pd.Series(advies, index=basis.index, dtype="object").ffill()
+
+
+# ✅ Rendementen op basis van adviesgroepering
+# Per groep: rendement van de eerste Close tot de eerste Close van de volgende groep
+# (de laatste groep loopt tot zijn eigen laatste Close), uitgesmeerd over de rijen van de groep
+def _rendementen(advies, close):
+    groep = (advies != advies.shift()).cumsum()
+    n = len(advies)
+    if not n:
+        return pd.DataFrame({
+            "Advies": advies.astype(ADVIES_CATEGORIE), "AdviesGroep": groep, "Markt-%": [], "SAM-%": []
+        })
+
+    g = groep.to_numpy()
+    begin = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    start = close[begin]
+    eind = np.r_[close[begin[1:]], close[-1]]
+    kopen = advies.to_numpy(dtype=object)[begin] == "Kopen"
+
+    geldig = start != 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        markt = np.where(geldig, (eind - start) / start, 0.0)
+    sam = np.where(geldig, np.where(kopen, markt, -markt), 0.0)
+
+    lengtes = np.diff(np.r_[begin, n])
+    return pd.DataFrame({
+        "Advies": advies.astype(ADVIES_CATEGORIE),
+        "AdviesGroep": groep,
+        "Markt-%": np.repeat(markt, lengtes),
+        "SAM-%": np.repeat(sam, lengtes),
+    })
+
+
+def _huidig_advies(advies):
+    return advies.dropna().iloc[-1] if advies.notna().any() else "Niet beschikbaar"
+
+
+def determine_advice(df, threshold, risk_aversion=0):
+    basis = _trendbasis(df)
+    uitkomst = _rendementen(_adviezen(basis, threshold, risk_aversion), basis["Close"].to_numpy(dtype="float64"))
+    return kies_advies(basis, {(risk_aversion, threshold): uitkomst}, risk_aversion, threshold)
+
+
+# 🧮 Adviesraster: advies en rendementen voor een reeks thresholds en alle risk_aversion-niveaus
+# in één keer, met één gedeelde Trend/Trail-basis. risk_aversion 1 en 2 hangen niet van de
+# threshold af en worden daarom per niveau één keer berekend en onder elke threshold gezet
+# (hetzelfde object; grootte_van telt het één keer).
+DREMPELS = (1, 2, 3, 4, 5)
+RISICONIVEAUS = (0, 1, 2)
+
+
+def adviesraster(df, thresholds=DREMPELS, risk_aversions=RISICONIVEAUS):
+    basis = _trendbasis(df)
+    close = basis["Close"].to_numpy(dtype="float64")
+    raster = {}
+    for risk_aversion in risk_aversions:
+        if risk_aversion == 0:
+            for threshold in thresholds:
+                raster[(0, threshold)] = _rendementen(_adviezen(basis, threshold, 0), close)
+        else:
+            uitkomst = _rendementen(_adviezen(basis, None, risk_aversion), close)
+            for threshold in thresholds:
+                raster[(risk_aversion, threshold)] = uitkomst
+    return basis, raster
+
+
+# ✅ Eén cel uit het raster als DataFrame zoals determine_advice die geeft
+def kies_advies(basis, raster, risk_aversion, threshold):
+    uitkomst = raster[(risk_aversion, threshold)]
+    df = basis.assign(**{kolom: uitkomst[kolom] for kolom in uitkomst.columns})
+    return df, _huidig_advies(uitkomst["Advies"])
@@ -0,0 +1,214 @@
+# adviesscanner.py
+import json
+import math
+import os
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import pandas as pd
+from advies import determine_advice
+from herbemonstering import BASIS_INTERVAL
+from indicatorcache import indicatoren, vingerafdruk
+from koersopslag import MIN_BARS, OPSLAG_MAP, bepaal_periode, haal_interval_bars, laad_markt, schoon_bars
+from marktklok import bar_gesloten, geldig_tot
+from sam_indicator import SCORE_KOLOMMEN
+from tickers import tabs_mapping
+
+# 📡 Adviesscanner: determine_advice voor alle tickers uit tabs_mapping, zonder dat iemand de app
+# open heeft. Per (ticker, interval) wordt pas opnieuw gekeken na de volgende bargrens (marktklok);
+# bars komen gebundeld en incrementeel binnen (laad_markt), SAM/SAT worden aangevuld (indicatoren).
+# Alleen afgesloten bars tellen: een bar in vorming wordt weggelaten, zodat een wissel niet binnen
+# dezelfde bar weer kan omslaan. Een wissel tussen Kopen en Verkopen wordt als gebeurtenis gepubliceerd:
+# in een wachtrij binnen het proces, als regel in een JSONL-bestand en optioneel als POST naar een webhook.
+
+SCAN_SECONDEN = 5         # hoe vaak er gekeken wordt of er (ticker, interval)-paren aan de beurt zijn
+FOUT_WACHTTIJD = 60       # na een mislukte of lege download eerder opnieuw proberen dan de bargrens
+WERKERS = int(os.environ.get("SAM_SCAN_WERKERS", 8))
+ALERT_BESTAND = os.environ.get("SAM_ALERT_BESTAND", os.path.join(os.path.dirname(OPSLAG_MAP), "alerts.jsonl"))
+ALERT_WEBHOOK = os.environ.get("SAM_ALERT_WEBHOOK", "")
+WEBHOOK_TIMEOUT = 5
+
+ADVIEZEN = ("Kopen", "Verkopen")
+
+
+# ✅ Universum: ticker -> (markt, naam); een ticker in meerdere tabs telt één keer
+def universum(mapping=None):
+    tickers = {}
+    for markt, tickers_dict in (mapping or tabs_mapping).items():
+        for ticker, naam in tickers_dict.items():
+            tickers.setdefault(ticker, (markt, naam))
+    return tickers
+
+
+# ✅ Bars zoals fetch_data in de app: zelfde ophaalroute en schoonmaak uit koersopslag
+def scan_bars(ticker, interval):
+    df = schoon_bars(haal_interval_bars(ticker, interval))
+    return df if len(df) >= MIN_BARS else pd.DataFrame()
+
+
+def _getal(waarde):
+    try:
+        waarde = float(waarde)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(waarde) else waarde
+
+
+# 📣 Publicatie van gebeurtenissen; een mislukte publicatie mag de scan nooit stoppen
+class Gebeurtenissen:
+    def __init__(self, bestand=ALERT_BESTAND, webhook=ALERT_WEBHOOK):
+        self.wachtrij = queue.Queue()
+        self.bestand = bestand
+        self.webhook = webhook
+        self.lock = threading.Lock()
+
+    def publiceer(self, gebeurtenis):
+        self.wachtrij.put(gebeurtenis)
+        regel = json.dumps(gebeurtenis, ensure_ascii=False)
+        if self.bestand:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.bestand)), exist_ok=True)
+                with self.lock, open(self.bestand, "a", encoding="utf-8") as f:
+                    f.write(regel + "\n")
+            except OSError:
+                pass
+        if self.webhook:
+            try:
+                verzoek = urllib.request.Request(
+                    self.webhook, data=regel.encode("utf-8"), headers={"Content-Type": "application/json"}
+                )
+                urllib.request.urlopen(verzoek, timeout=WEBHOOK_TIMEOUT).close()
+            except Exception:
+                pass
+
+
+class AdviesScanner:
+    def __init__(self, intervallen=("1d",), risk_aversion=1, threshold=2, tickers=None, werkers=WERKERS,
+                 gebeurtenissen=None):
+        self.intervallen = list(intervallen)
+        self.risk_aversion = risk_aversion
+        self.threshold = threshold
+        self.tickers = tickers or universum()
+        self.gebeurtenissen = gebeurtenissen or Gebeurtenissen()
+        self.pool = ThreadPoolExecutor(max_workers=werkers, thread_name_prefix="adviesscanner")
+        self._volgende = {}     # (ticker, interval) -> epoch waarop opnieuw gekeken wordt
+        self._afdrukken = {}    # (ticker, interval) -> vingerafdruk van de laatst beoordeelde bars
+        self._adviezen = {}     # (ticker, interval) -> laatst bekende advies
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ✅ Eén ronde: alleen paren waarvan de bargrens voorbij is; geeft de nieuwe gebeurtenissen terug
+    def scan(self):
+        nu = time.time()
+        aan_de_beurt = [
+            (ticker, interval)
+            for interval in self.intervallen
+            for ticker in self.tickers
+            if nu >= self._volgende.get((ticker, interval), 0.0)
+        ]
+        if not aan_de_beurt:
+            return []
+
+        # 📦 Eerst gebundeld bijwerken per (basis)interval, daarna per ticker parallel beoordelen
+        for interval in self.intervallen:
+            basis = BASIS_INTERVAL.get(interval, interval)
+            te_laden = {t: None for t, i in aan_de_beurt if i == interval}
+            if te_laden:
+                laad_markt(te_laden, basis, bepaal_periode(basis))
+
+        gebeurtenissen = [g for g in self.pool.map(self._beoordeel, aan_de_beurt) if g is not None]
+        for gebeurtenis in gebeurtenissen:
+            self.gebeurtenissen.publiceer(gebeurtenis)
+        return gebeurtenissen
+
+    def _beoordeel(self, paar):
+        ticker, interval = paar
+        try:
+            df = scan_bars(ticker, interval)
+            if df.empty:
+                self._volgende[paar] = time.time() + FOUT_WACHTTIJD
+                return None
+            self._volgende[paar] = geldig_tot(ticker, interval)
+            if not bar_gesloten(ticker, interval, df.index[-1]):
+                df = df.iloc[:-1]  # 🕓 bar in vorming: pas beoordelen als hij gesloten is
+
+            afdruk = vingerafdruk(df)
+            if self._afdrukken.get(paar) == afdruk:
+                return None  # niets nieuws sinds de vorige ronde
+            df, advies = determine_advice(
+                indicatoren(ticker, interval, df, gesloten=True),
+                threshold=self.threshold,
+                risk_aversion=self.risk_aversion,
+            )
+        except Exception:
+            self._volgende[paar] = time.time() + FOUT_WACHTTIJD  # één kapotte ticker stopt de ronde niet
+            return None
+        self._afdrukken[paar] = afdruk
+        vorig = self._adviezen.get(paar)
+        self._adviezen[paar] = advies
+
+        # 🔁 Alleen een echte wissel; de eerste ronde legt alleen de uitgangssituatie vast
+        if vorig not in ADVIEZEN or advies not in ADVIEZEN or advies == vorig:
+            return None
+        return self._gebeurtenis(ticker, interval, vorig, advies, df)
+
+    def _gebeurtenis(self, ticker, interval, vorig, advies, df):
+        laatste = df.iloc[-1]
+        markt, naam = self.tickers[ticker]
+        return {
+            "tijdstip": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "bar": pd.Timestamp(df.index[-1]).isoformat(),
+            "ticker": ticker,
+            "naam": naam,
+            "markt": markt,
+            "interval": interval,
+            "van": vorig,
+            "naar": advies,
+            "risk_aversion": self.risk_aversion,
+            "threshold": self.threshold,
+            "Close": _getal(laatste["Close"]),
+            **{kolom: _getal(laatste[kolom]) for kolom in SCORE_KOLOMMEN + ["Trend", "SAT_Stage", "SAT_Trend"]},
+        }
+
+    # ✅ Doorlopend scannen in een achtergrondthread
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._lus, name="adviesscanner", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.pool.shutdown(wait=True)
+
+    def _lus(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception:
+                pass  # bv. tijdelijk geen netwerk; de volgende ronde probeert het opnieuw
+            self._stop.wait(SCAN_SECONDEN)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Gebruik: python adviesscanner.py [--interval 1d] [--interval 1h] [--risk 1] [--threshold 2]
+    argumenten = sys.argv[1:]
+    intervallen = [argumenten[i + 1] for i, a in enumerate(argumenten) if a == "--interval"] or ["1d"]
+    risk = int(argumenten[argumenten.index("--risk") + 1]) if "--risk" in argumenten else 1
+    threshold = int(argumenten[argumenten.index("--threshold") + 1]) if "--threshold" in argumenten else 2
+
+    scanner = AdviesScanner(intervallen, risk_aversion=risk, threshold=threshold)
+    scanner.start()
+    print(f"Scanner actief: {len(scanner.tickers)} tickers, intervallen {intervallen}", flush=True)
+    try:
+        while True:
+            print(json.dumps(scanner.gebeurtenissen.wachtrij.get(), ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        scanner.stop()
@@ -5,6 +5,7 @@ import pandas as pd
 from alpaca.trading.client import TradingClient
 from alpaca.trading.enums import OrderSide, TimeInForce
 from alpaca.trading.requests import MarketOrderRequest, TrailingStopOrderRequest
+from koersbord import laatste_koers
 
 def verbind_met_alpaca():
     try:
@@ -18,13 +19,8 @@ def verbind_met_alpaca():
         return None, None
 
 def haal_laatste_koers(ticker):
-    try:
-        live_data = yf.download(ticker, period="1d", interval="1d", progress=False)
-        if isinstance(live_data, pd.DataFrame) and "Close" in live_data.columns:
-            return float(live_data["Close"].dropna().iloc[-1].squeeze())
-    except:
-        return None
-    return None
+    # Uit het gedeelde koersbord, zonder eigen download
+    return laatste_koers(ticker)
 
 def plaats_order(client, ticker, bedrag, last_price, advies, order_type="Market", trailing_pct=None):
     aantal = int(bedrag / last_price)
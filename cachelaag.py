@@ -0,0 +1,311 @@
+# cachelaag.py
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+
+# 🗄️ Optionele gedeelde cache voor meerdere replica's:
+#   "sqlite:/gedeeld/sam_cache.db", "disk:/gedeeld/sam_cache" of "redis://host:6379/0"
+GEDEELDE_BACKEND = os.environ.get("SAM_CACHE_BACKEND", "")
+GEDEELD_TTL = 7 * 24 * 3600  # opruimtermijn; sleutels bevatten zelf al versie en geldigheid
+
+# 📦 Geheugenbudget per laag in MB (instelbaar via omgevingsvariabelen)
+BUDGET_MB = {
+    "bars": float(os.environ.get("SAM_CACHE_BARS_MB", 512)),
+    "indicatoren": float(os.environ.get("SAM_CACHE_INDICATOREN_MB", 512)),
+    "advies": float(os.environ.get("SAM_CACHE_ADVIES_MB", 256)),
+}
+
+
+# ✅ Geschatte geheugengrootte van een cachewaarde; hetzelfde object op meerdere plekken
+# (bv. één adviesframe onder elke threshold) telt één keer
+def grootte_van(waarde, gezien=None):
+    gezien = set() if gezien is None else gezien
+    if id(waarde) in gezien:
+        return 0
+    gezien.add(id(waarde))
+    if isinstance(waarde, pd.DataFrame):
+        return int(waarde.memory_usage(index=True, deep=True).sum())
+    if isinstance(waarde, pd.Series):
+        return int(waarde.memory_usage(index=True, deep=True))
+    if isinstance(waarde, (tuple, list)):
+        return sum(grootte_van(w, gezien) for w in waarde) + sys.getsizeof(waarde)
+    if isinstance(waarde, dict):
+        return sum(grootte_van(w, gezien) for w in waarde.values()) + sys.getsizeof(waarde)
+    return sys.getsizeof(waarde)
+
+
+# ✅ Kopie bij uitlezen, zodat aanroepers (bv. calculate_sat) de cache niet kunnen wijzigen
+def _kopie(waarde):
+    if isinstance(waarde, (pd.DataFrame, pd.Series)):
+        return waarde.copy()
+    if isinstance(waarde, tuple):
+        return tuple(_kopie(w) for w in waarde)
+    if isinstance(waarde, dict):
+        return {k: _kopie(w) for k, w in waarde.items()}
+    return waarde
+
+
+# ✅ Lege uitkomst (mislukte download): niet cachen, anders blijft die tot de volgende geldigheid staan
+def is_leeg(waarde):
+    if waarde is None:
+        return True
+    if isinstance(waarde, (pd.DataFrame, pd.Series)):
+        return waarde.empty
+    if isinstance(waarde, tuple):
+        return all(is_leeg(w) for w in waarde)
+    return False
+
+
+class BegrensdeCache:
+    def __init__(self, naam, budget_bytes):
+        self.naam = naam
+        self.budget_bytes = budget_bytes
+        self.items = OrderedDict()  # sleutel -> (waarde, grootte), oudste eerst
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.gedeelde_hits = 0  # misses in het geheugen die uit de gedeelde backend kwamen
+        self.lock = threading.Lock()
+
+    def haal(self, sleutel):
+        with self.lock:
+            if sleutel in self.items:
+                self.items.move_to_end(sleutel)
+                self.hits += 1
+                return True, self.items[sleutel][0]
+            self.misses += 1
+            return False, None
+
+    def zet(self, sleutel, waarde):
+        grootte = grootte_van(waarde)
+        if grootte > self.budget_bytes:
+            return  # past nooit, dan ook niet de rest van de cache leegmaken
+        with self.lock:
+            if sleutel in self.items:
+                self.bytes -= self.items.pop(sleutel)[1]
+            self.items[sleutel] = (waarde, grootte)
+            self.bytes += grootte
+            while self.bytes > self.budget_bytes:
+                _, (_, oud) = self.items.popitem(last=False)
+                self.bytes -= oud
+                self.evictions += 1
+
+    def wis(self):
+        with self.lock:
+            self.items.clear()
+            self.bytes = 0
+
+
+_caches = {laag: BegrensdeCache(laag, int(mb * 1024 * 1024)) for laag, mb in BUDGET_MB.items()}
+
+
+# --- Gedeelde backends (tweede laag achter de LRU in het geheugen) ---
+class SqliteBackend:
+    def __init__(self, pad):
+        os.makedirs(os.path.dirname(os.path.abspath(pad)), exist_ok=True)
+        self.db = sqlite3.connect(pad, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (sleutel TEXT PRIMARY KEY, waarde BLOB, verloopt REAL)"
+            )
+            self.db.execute("DELETE FROM cache WHERE verloopt < ?", (time.time(),))
+            self.db.commit()
+
+    def haal(self, sleutel):
+        with self.lock:
+            rij = self.db.execute(
+                "SELECT waarde FROM cache WHERE sleutel = ? AND verloopt >= ?", (sleutel, time.time())
+            ).fetchone()
+        return rij[0] if rij else None
+
+    def zet(self, sleutel, data):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (sleutel, data, time.time() + GEDEELD_TTL)
+            )
+            self.db.commit()
+
+
+class DiskBackend:
+    def __init__(self, map_):
+        self.map = map_
+        os.makedirs(map_, exist_ok=True)
+
+    def haal(self, sleutel):
+        pad = os.path.join(self.map, sleutel + ".pkl")
+        try:
+            if time.time() - os.path.getmtime(pad) > GEDEELD_TTL:
+                return None
+            with open(pad, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def zet(self, sleutel, data):
+        pad = os.path.join(self.map, sleutel + ".pkl")
+        tijdelijk = f"{pad}.{os.getpid()}.tmp"
+        with open(tijdelijk, "wb") as f:
+            f.write(data)
+        os.replace(tijdelijk, pad)  # atomair, andere replica's zien nooit een half bestand
+
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis  # optioneel, alleen nodig voor deze backend
+        self.redis = redis.Redis.from_url(url)
+
+    def haal(self, sleutel):
+        return self.redis.get(sleutel)
+
+    def zet(self, sleutel, data):
+        self.redis.set(sleutel, data, ex=GEDEELD_TTL)
+
+
+def _maak_backend(spec):
+    if not spec:
+        return None
+    if spec.startswith("sqlite:"):
+        return SqliteBackend(spec[len("sqlite:"):])
+    if spec.startswith("disk:"):
+        return DiskBackend(spec[len("disk:"):])
+    if spec.startswith("redis://") or spec.startswith("rediss://"):
+        return RedisBackend(spec)
+    raise ValueError(f"Onbekende SAM_CACHE_BACKEND: {spec}")
+
+
+_gedeeld = _maak_backend(GEDEELDE_BACKEND)
+
+
+def _gedeelde_sleutel(laag, versie, sleutel):
+    return f"{laag}-{versie}-" + hashlib.sha1(repr(sleutel).encode()).hexdigest()
+
+
+def _haal_gedeeld(sleutel):
+    if _gedeeld is None:
+        return False, None
+    try:
+        data = _gedeeld.haal(sleutel)
+        return (True, pickle.loads(data)) if data is not None else (False, None)
+    except Exception:
+        return False, None  # gedeelde cache is een versnelling, nooit een reden om te falen
+
+
+def _zet_gedeeld(sleutel, waarde):
+    if _gedeeld is None:
+        return
+    try:
+        _gedeeld.zet(sleutel, pickle.dumps(waarde, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        pass
+
+
+# ✅ Cachesleutel uit de argumenten; DataFrames worden op inhoud gehasht (zoals st.cache_data)
+def _sleutel_deel(arg):
+    if isinstance(arg, (pd.DataFrame, pd.Series)):
+        h = hashlib.sha1(pd.util.hash_pandas_object(arg, index=True).values.tobytes())
+        if isinstance(arg, pd.DataFrame):
+            h.update(pickle.dumps(list(arg.columns)))
+        return ("df", arg.shape, h.hexdigest())
+    return arg
+
+
+def maak_sleutel(functie, args, kwargs):
+    return (
+        functie.__module__,
+        functie.__qualname__,
+        tuple(_sleutel_deel(a) for a in args),
+        tuple(sorted((k, _sleutel_deel(v)) for k, v in kwargs.items())),
+    )
+
+
+# ✅ Decorator als vervanger van @st.cache_data, met begrensd geheugen en LRU-verwijdering
+# versie = versie van de rekencode; bij een wijziging worden oude gedeelde resultaten genegeerd
+# geldigheid = naam van het argument met de geldigheid (bv. "geldig_tot" uit marktklok): dat zit niet in de
+# sleutel maar wordt bij de waarde bewaard, zodat een verversing het oude item vervangt in plaats van
+# er per geldigheidsvenster een kopie naast te zetten
+def begrensde_cache(laag, versie="1", geldigheid=None):
+    cache = _caches[laag]
+
+    def decorator(functie):
+        handtekening = inspect.signature(functie)
+
+        @functools.wraps(functie)
+        def wrapper(*args, **kwargs):
+            geldig = None
+            if geldigheid is None:
+                sleutel = maak_sleutel(functie, args, kwargs)
+            else:
+                gebonden = handtekening.bind(*args, **kwargs)
+                gebonden.apply_defaults()
+                argumenten = dict(gebonden.arguments)
+                geldig = argumenten.pop(geldigheid)
+                sleutel = maak_sleutel(functie, (), argumenten)
+
+            gevonden, item = cache.haal(sleutel)
+            if not gevonden or item[0] != geldig:
+                gedeelde_sleutel = _gedeelde_sleutel(laag, versie, ("geldig", sleutel))
+                gevonden, item = _haal_gedeeld(gedeelde_sleutel)
+                if gevonden and item[0] == geldig:
+                    cache.gedeelde_hits += 1
+                else:
+                    waarde = functie(*args, **kwargs)
+                    if is_leeg(waarde):
+                        return waarde  # volgende aanroep probeert het opnieuw (symboolstatus remt kapotte symbolen)
+                    item = (geldig, waarde)
+                    _zet_gedeeld(gedeelde_sleutel, item)
+                cache.zet(sleutel, item)  # zelfde sleutel: het verlopen item wordt vervangen
+            return _kopie(item[1])
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+# ✅ Directe toegang tot een laag, voor caches met een eigen sleutel (zie indicatorcache.py)
+def cache_laag(laag):
+    return _caches[laag]
+
+
+# ✅ Gedeelde backend voor caches met een eigen sleutel; een treffer telt als gedeelde hit van de laag
+def haal_gedeeld(laag, versie, sleutel):
+    gevonden, waarde = _haal_gedeeld(_gedeelde_sleutel(laag, versie, sleutel))
+    if gevonden:
+        with _caches[laag].lock:
+            _caches[laag].gedeelde_hits += 1
+    return gevonden, waarde
+
+
+def zet_gedeeld(laag, versie, sleutel, waarde):
+    _zet_gedeeld(_gedeelde_sleutel(laag, versie, sleutel), waarde)
+
+
+# ✅ Tellers per laag, voor weergave in de app
+def statistieken():
+    rijen = []
+    for laag, cache in _caches.items():
+        with cache.lock:
+            totaal = cache.hits + cache.misses
+            rijen.append({
+                "Laag": laag,
+                "Items": len(cache.items),
+                "Gebruik (MB)": round(cache.bytes / 1024 / 1024, 1),
+                "Budget (MB)": round(cache.budget_bytes / 1024 / 1024, 1),
+                "Hits": cache.hits,
+                "Misses": cache.misses,
+                "Evictions": cache.evictions,
+                "Gedeelde hits": cache.gedeelde_hits,
+                "Hitrate": f"{cache.hits / totaal:.0%}" if totaal else "n.v.t.",
+            })
+    return pd.DataFrame(rijen)
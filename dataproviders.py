@@ -0,0 +1,162 @@
+# dataproviders.py
+import os
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import yfinance as yf
+from alpaca.data.historical import StockHistoricalDataClient
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+
+# 🔌 Bron voor koersdata: "yfinance" (standaard), "alpaca" of "replay"
+ACTIEVE_PROVIDER = os.environ.get("SAM_DATA_PROVIDER", "yfinance")
+REPLAY_MAP = os.environ.get(
+    "SAM_REPLAY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "replay")
+)
+OHLCV_KOLOMMEN = ["Open", "High", "Low", "Close", "Volume"]
+
+
+# ✅ Bestandsnaam per ticker + interval, gedeeld door bar-opslag en replay
+def bestandsnaam(ticker, interval, extensie="parquet"):
+    veilige_ticker = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker)
+    return f"{veilige_ticker}_{interval}.{extensie}"
+
+
+# ✅ Zorg voor platte OHLCV-kolommen (yfinance geeft een MultiIndex terug)
+def normaliseer_bars(df):
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    kolommen = [col for col in OHLCV_KOLOMMEN if col in df.columns]
+    df = df[kolommen]
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index, errors="coerce")
+    df = df[~df.index.isna()]
+    df.index.name = "Datetime"
+    # Gedeelde index over beurzen heen → rijen zonder koers weghalen
+    if "Close" in df.columns:
+        df = df.dropna(subset=["Close"])
+    return df.astype("float64")
+
+
+# ✅ Periode-code ("30d", "720d", "20y", "1wk", "1mo") naar starttijd
+def periode_naar_start(period):
+    eenheid = period.lstrip("0123456789")
+    aantal = int(period[:len(period) - len(eenheid)])
+    dagen = {"d": 1, "wk": 7, "mo": 31, "y": 366}[eenheid]
+    return datetime.now(timezone.utc) - timedelta(days=aantal * dagen)
+
+
+# --- yfinance ---
+def yfinance_bars(tickers, interval, period=None, start=None):
+    if start is not None:
+        data = yf.download(tickers, interval=interval, start=start, progress=False, group_by="ticker")
+    else:
+        data = yf.download(tickers, interval=interval, period=period, progress=False, group_by="ticker")
+
+    resultaat = {}
+    if data is None or data.empty:
+        return resultaat
+    for ticker in tickers:
+        try:
+            df = normaliseer_bars(data[ticker])
+        except KeyError:
+            continue
+        if not df.empty:
+            resultaat[ticker] = df
+    return resultaat
+
+
+# --- Alpaca historische bars ---
+ALPACA_TIMEFRAME = {
+    "15m": TimeFrame(15, TimeFrameUnit.Minute),
+    "1h": TimeFrame(1, TimeFrameUnit.Hour),
+    "4h": TimeFrame(4, TimeFrameUnit.Hour),
+    "1d": TimeFrame(1, TimeFrameUnit.Day),
+    "1wk": TimeFrame(1, TimeFrameUnit.Week),
+    "1mo": TimeFrame(1, TimeFrameUnit.Month),
+}
+
+_alpaca_client = None
+
+
+def _alpaca():
+    global _alpaca_client
+    if _alpaca_client is None:
+        try:
+            import streamlit as st
+            api_key = st.secrets["ALPACA_API_KEY"]
+            secret_key = st.secrets["ALPACA_SECRET_KEY"]
+        except Exception:
+            api_key = os.environ["ALPACA_API_KEY"]
+            secret_key = os.environ["ALPACA_SECRET_KEY"]
+        _alpaca_client = StockHistoricalDataClient(api_key, secret_key)
+    return _alpaca_client
+
+
+def alpaca_bars(tickers, interval, period=None, start=None):
+    if start is None:
+        start = periode_naar_start(period)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    # Alle symbolen in één verzoek; de SDK volgt zelf de next_page_token-paginering
+    verzoek = StockBarsRequest(
+        symbol_or_symbols=list(tickers),
+        timeframe=ALPACA_TIMEFRAME[interval],
+        start=start,
+        adjustment="all",
+    )
+    data = _alpaca().get_stock_bars(verzoek).df
+
+    resultaat = {}
+    if data is None or data.empty:
+        return resultaat
+    data = data.rename(columns=str.capitalize)
+    for ticker in tickers:
+        if ticker not in data.index.get_level_values("symbol"):
+            continue
+        df = normaliseer_bars(data.xs(ticker, level="symbol"))
+        if not df.empty:
+            resultaat[ticker] = df
+    return resultaat
+
+
+# --- Replay van opgenomen OHLCV-bestanden (geen netwerk) ---
+# Verwacht <ticker>_<interval>.parquet of .csv in REPLAY_MAP; de bar-opslag zelf is ook bruikbaar.
+def replay_bars(tickers, interval, period=None, start=None):
+    resultaat = {}
+    for ticker in tickers:
+        parquet = os.path.join(REPLAY_MAP, bestandsnaam(ticker, interval))
+        csv = os.path.join(REPLAY_MAP, bestandsnaam(ticker, interval, "csv"))
+        if os.path.exists(parquet):
+            df = pd.read_parquet(parquet)
+        elif os.path.exists(csv):
+            df = pd.read_csv(csv, index_col=0, parse_dates=True)
+        else:
+            continue
+        df = normaliseer_bars(df)
+        if start is not None:
+            vanaf = pd.Timestamp(start)
+            if df.index.tz is None:
+                vanaf = vanaf.tz_localize(None)
+            elif vanaf.tz is None:
+                vanaf = vanaf.tz_localize(df.index.tz)
+            df = df[df.index >= vanaf]
+        if not df.empty:
+            resultaat[ticker] = df
+    return resultaat
+
+
+PROVIDERS = {
+    "yfinance": yfinance_bars,
+    "alpaca": alpaca_bars,
+    "replay": replay_bars,
+}
+
+
+# ✅ Eén toegangspunt: geeft {ticker: DataFrame} terug voor één of meerdere tickers
+def download(tickers, interval, period=None, start=None, provider=None):
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    return PROVIDERS[provider or ACTIEVE_PROVIDER](list(tickers), interval, period=period, start=start)
@@ -0,0 +1,192 @@
+# di_indicator.py
+import math
+import numpy as np
+import pandas as pd
+
+# 📐 DI+ en DI- (Wilder) zonder ta: zelfde rekenvolgorde als ta.trend.ADXIndicator(window, fillna=True),
+# dus bit-gelijk, maar zonder pandas-kopieën en met de drie smoothings in één lus.
+
+
+def _nan(x):
+    return x != x
+
+
+def _verschuif(arr):
+    uit = np.empty_like(arr)
+    uit[0] = np.nan
+    uit[1:] = arr[:-1]
+    return uit
+
+
+# ✅ fillna=True van ta: inf → NaN, dan vorige waarde, en wat overblijft wordt 20
+def _vul(reeks):
+    reeks[~np.isfinite(reeks)] = np.nan
+    return pd.Series(reeks).ffill().fillna(20).to_numpy()
+
+
+# ✅ TR, +DM en -DM (1-D of bars × tickers, langs de eerste as)
+def _bewegingen(high, low, close):
+    vorige_close = _verschuif(close)
+    dm = np.maximum(high, vorige_close) - np.minimum(low, vorige_close)
+    diff_up = high - _verschuif(high)
+    diff_down = _verschuif(low) - low
+    with np.errstate(invalid="ignore"):
+        pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+        neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+    return dm, pos, neg
+
+
+# ✅ Startwaarde: som van de eerste `window` geldige waarden (ta: dropna().iloc[0:window].sum())
+def _startsom(x, window):
+    return x[~np.isnan(x)][:window].sum()
+
+
+# ✅ De Wilder-lus: geeft de ruwe DI-lijsten en de eindtoestand (trs, dip, din)
+def _di_lus(high, low, close, window):
+    n = len(close)
+    dm, pos, neg = _bewegingen(high, low, close)
+    trs, dip, din = (_startsom(x, window) for x in (dm, pos, neg))
+
+    w = float(window)
+    dm_l, pos_l, neg_l = dm.tolist(), pos.tolist(), neg.tolist()
+    plus_l, min_l = [0.0] * n, [0.0] * n
+    for i in range(window + 1, n):
+        trs = trs - (trs / w) + dm_l[i]
+        dip = dip - (dip / w) + pos_l[i]
+        din = din - (din / w) + neg_l[i]
+        if trs != 0:
+            plus_l[i], min_l[i] = 100 * (dip / trs), 100 * (din / trs)
+    return plus_l, min_l, (trs, dip, din)
+
+
+# ✅ Eén reeks (1-D arrays): geeft (di_plus, di_minus); de eerste window+1 bars zijn 0 zoals bij ta
+def di_reeks(high, low, close, window=14):
+    high, low, close = (np.asarray(x, dtype="float64") for x in (high, low, close))
+    n = len(close)
+    if n <= window + 1:
+        return np.zeros(n), np.zeros(n)
+    plus_l, min_l, _ = _di_lus(high, low, close, window)
+    return _vul(np.array(plus_l)), _vul(np.array(min_l))
+
+
+# ✅ Panel (bars × tickers): dezelfde Wilder-lus, per bar gevectoriseerd over alle tickers. Elke
+# kolom start bij zijn eerste geldige bar (opvulling bovenaan blijft 0), dus elke kolom is gelijk
+# aan di_reeks op de eigen historie.
+def di_panel(high, low, close, window=14):
+    n, aantal = close.shape
+    geldig = ~np.isnan(close)
+    start = np.where(geldig.any(axis=0), geldig.argmax(axis=0), n)
+    voor_start = np.arange(n)[:, None] < start[None, :]
+    high, low, close = (np.where(voor_start, np.nan, x) for x in (high, low, close))
+    dm, pos, neg = _bewegingen(high, low, close)
+
+    # Startwaarden per kolom (een handvol optellingen per ticker, niet per bar)
+    trs, dip, din = (
+        np.array([_startsom(x[start[j]:, j], window) if start[j] < n else 0.0 for j in range(aantal)])
+        for x in (dm, pos, neg)
+    )
+
+    w = float(window)
+    actief_vanaf = start + window  # de smoothing loopt vanaf bar start + window + 1
+    di_plus, di_minus = np.zeros((n, aantal)), np.zeros((n, aantal))
+    eerste = int(actief_vanaf.min()) + 1 if aantal else n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i in range(eerste, n):
+            actief = i > actief_vanaf
+            trs = np.where(actief, trs - (trs / w) + dm[i], trs)
+            dip = np.where(actief, dip - (dip / w) + pos[i], dip)
+            din = np.where(actief, din - (din / w) + neg[i], din)
+            zet = actief & (trs != 0)
+            di_plus[i] = np.where(zet, 100 * (dip / trs), 0.0)
+            di_minus[i] = np.where(zet, 100 * (din / trs), 0.0)
+
+    # fillna=True per kolom: inf → NaN, dan vorige waarde (de nullen vóór de smoothing tellen mee)
+    for di in (di_plus, di_minus):
+        di[~np.isfinite(di)] = np.nan
+        di[:] = pd.DataFrame(di).ffill().fillna(20).to_numpy()
+    return di_plus, di_minus
+
+
+# ✅ DI+ en DI- zoals ta.trend.ADXIndicator(window, fillna=True): Wilder-smoothing per bar.
+# Elke update geeft de laatste waarde van di_reeks over de historie tot en met die bar. De startsommen
+# zijn de eerste `window` geldige waarden; zolang die door NaN nog niet vastliggen, wordt de korte
+# opwarmperiode per bar opnieuw doorgerekend, daarna gaat het in O(1) per bar.
+class DIStaat:
+    def __init__(self, window=14):
+        self.window = window
+        self.bar = 0
+        self.vorige = None  # (high, low, close) van de vorige bar
+        self.opwarming = []  # (TR, +DM, -DM) per bar zolang de startsommen niet vastliggen, daarna None
+        self.trs = self.dip = self.din = 0.0
+        self.laatste = (0.0, 0.0)
+
+    # ✅ Toestand na een hele reeks in één vectorpass (i.p.v. bar voor bar); zonder NaN in de invoer
+    # is dat dezelfde toestand als na update() per bar
+    @classmethod
+    def uit_reeks(cls, high, low, close, window=14):
+        high, low, close = (np.asarray(x, dtype="float64") for x in (high, low, close))
+        staat = cls(window)
+        if len(close) <= window + 1 or np.isnan(np.concatenate([high, low, close])).any():
+            for h, l, c in zip(high.tolist(), low.tolist(), close.tolist()):
+                staat.update(h, l, c)
+            return staat
+        plus_l, min_l, (staat.trs, staat.dip, staat.din) = _di_lus(high, low, close, window)
+        staat.bar = len(close)
+        staat.vorige = (float(high[-1]), float(low[-1]), float(close[-1]))
+        staat.opwarming = None
+        staat.laatste = (float(_vul(np.array(plus_l))[-1]), float(_vul(np.array(min_l))[-1]))
+        return staat
+
+    def update(self, high, low, close):
+        if self.vorige is None:
+            self.vorige = (high, low, close)
+            self.bar = 1
+            return 0.0, 0.0
+
+        vorige_high, vorige_low, vorige_close = self.vorige
+        dm = max(high, vorige_close) - min(low, vorige_close)
+        if _nan(high) or _nan(vorige_close) or _nan(low):
+            dm = math.nan
+        diff_up = high - vorige_high
+        diff_down = vorige_low - low
+        pos = abs(float((diff_up > diff_down) and (diff_up > 0)) * diff_up)
+        neg = abs(float((diff_down > diff_up) and (diff_down > 0)) * diff_down)
+        self.vorige = (high, low, close)
+        self.bar += 1
+
+        if self.opwarming is not None:
+            self.opwarming.append((dm, pos, neg))
+            return self._opwarmen()
+
+        w = float(self.window)
+        self.trs = self.trs - (self.trs / w) + dm
+        self.dip = self.dip - (self.dip / w) + pos
+        self.din = self.din - (self.din / w) + neg
+        return self._di()
+
+    # DI uit de huidige sommen; fillna=True: NaN/inf → vorige waarde (ffill)
+    def _di(self):
+        if self.trs != 0:
+            di_plus, di_minus = 100 * (self.dip / self.trs), 100 * (self.din / self.trs)
+        else:
+            di_plus, di_minus = 0.0, 0.0
+        di_plus = self.laatste[0] if _nan(di_plus) or math.isinf(di_plus) else di_plus
+        di_minus = self.laatste[1] if _nan(di_minus) or math.isinf(di_minus) else di_minus
+        self.laatste = (di_plus, di_minus)
+        return di_plus, di_minus
+
+    # Opwarmperiode zoals _di_lus: startsommen uit de eerste `window` geldige waarden tot nu toe,
+    # dan de smoothing vanaf bar window + 1 (opwarming[k] hoort bij bar k + 1)
+    def _opwarmen(self):
+        w = self.window
+        geldig = [[x for x in reeks if not _nan(x)] for reeks in zip(*self.opwarming)]
+        self.trs, self.dip, self.din = (np.array(g[:w]).sum() for g in geldig)
+        self.laatste = (0.0, 0.0)
+        for dm, pos, neg in self.opwarming[w:]:
+            self.trs = self.trs - (self.trs / float(w)) + dm
+            self.dip = self.dip - (self.dip / float(w)) + pos
+            self.din = self.din - (self.din / float(w)) + neg
+            self._di()
+        if all(len(g) >= w for g in geldig):
+            self.opwarming = None  # startsommen liggen vast, verder incrementeel
+        return self.laatste
@@ -1,12 +1,10 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
-import ta
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta, date
 import matplotlib.pyplot as plt
-from ta.trend import ADXIndicator
 
 # 📆 Periode voor SAM-grafiek op basis van interval
 def bepaal_grafiekperiode(interval):
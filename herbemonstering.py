@@ -0,0 +1,55 @@
+# herbemonstering.py
+import pandas as pd
+
+# 🔁 Grovere intervallen worden lokaal afgeleid van de fijnste opgeslagen bars
+BASIS_INTERVAL = {
+    "4h": "1h",
+    "1wk": "1d",
+    "1mo": "1d",
+}
+
+AGGREGATIE = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
+
+
+# ✅ Zelfde schoonmaakregels als fetch_data: geen volume-loze of vlakke bars
+def geldige_bars(df):
+    return (df["Volume"] > 0) & ((df["Open"] != df["Close"]) | (df["High"] != df["Low"]))
+
+
+# ✅ Groepssleutel per bar; gerekend in lokale beurstijd zodat blokken op sessiegrenzen vallen
+def _groepssleutel(index, doel_interval):
+    lokaal = index.tz_localize(None) if index.tz is not None else index
+    dag = lokaal.normalize()
+
+    if doel_interval == "4h":
+        # 4-uursblokken verankerd aan de eerste bar van elke handelsdag (bv. 09:30 → 13:30 → sluiting)
+        eerste = pd.Series(lokaal, index=lokaal).groupby(dag).transform("min").values
+        blok = (lokaal.values - eerste) // pd.Timedelta(hours=4)
+        return pd.Index(eerste + blok * pd.Timedelta(hours=4))
+    elif doel_interval == "1wk":
+        return dag - pd.to_timedelta(lokaal.dayofweek, unit="D")
+    elif doel_interval == "1mo":
+        return dag - pd.to_timedelta(lokaal.day - 1, unit="D")
+    raise ValueError(f"Onbekend doelinterval voor herbemonstering: {doel_interval}")
+
+
+def herbemonster(df, doel_interval):
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    df = df[geldige_bars(df)]
+    if df.empty:
+        return pd.DataFrame()
+
+    sleutel = _groepssleutel(df.index, doel_interval)
+    # Label = tijdstempel van de eerste echte bar in de groep (tijdzone blijft behouden)
+    groepen = df.assign(Datetime=df.index).groupby(sleutel.values, sort=True)
+    uit = groepen.agg({**AGGREGATIE, "Datetime": "first"})
+    uit = uit.set_index("Datetime")
+    return uit[list(AGGREGATIE)]
@@ -0,0 +1,93 @@
+# indicatorcache.py
+import copy
+import numpy as np
+import pandas as pd
+from cachelaag import cache_laag, haal_gedeeld, zet_gedeeld
+from sam_componenten import is_standaard, register_sleutel
+from sam_indicator import SAM_VERSIE, SCORE_KOLOMMEN, calculate_sam
+from sam_stream import SamStroom
+from sat_indicator import SAT_VERSIE, calculate_sat, vul_sat_aan
+
+# 🧮 SAM + SAT per (ticker, interval), met een vingerafdruk als sleutel i.p.v. een hash van de hele
+# DataFrame: opzoeken kost O(1). Zijn er alleen bars bijgekomen, dan worden alleen die doorgerekend
+# (SAM via de streaming-engine, SAT vanaf de eerste nieuwe bar); de uitkomst is gelijk aan volledig herberekenen.
+# De streaming-engine kent alleen de standaardcomponenten en -parameters; is het register aangepast
+# (andere component of SAM_PARAMS), dan wordt altijd volledig herberekend.
+# Met een gedeelde backend (SAM_CACHE_BACKEND) gaan standaarduitkomsten ook per vingerafdruk naar de
+# andere replica's; de toestand van de streaming-engine blijft in het eigen proces.
+INDICATOR_VERSIE = f"{SAM_VERSIE}.{SAT_VERSIE}"
+MAX_AANVULLEN = 500  # bij meer nieuwe bars is volledig herberekenen sneller
+
+_cache = cache_laag("indicatoren")
+
+
+# ✅ Eerste/laatste bar, aantal bars en de laatste close (die verandert zolang de bar zich vormt)
+def vingerafdruk(df):
+    if df.empty:
+        return (0,)
+    return (df.index[0], df.index[-1], len(df), float(df["Close"].iloc[-1]))
+
+
+def _volledig(df):
+    return calculate_sat(calculate_sam(df, lean=True))
+
+
+# ✅ Alleen nieuwe bars doorrekenen; None als de historie zelf veranderd is (bv. aangepaste koersen)
+def _aanvullen(df, vorig, stroom):
+    oud = len(vorig)
+    p = oud - 1  # de laatst opgeslagen bar kan sindsdien nog gewijzigd zijn, dus die wordt herzien
+    if (
+        oud < 2
+        or not oud <= len(df) <= oud + MAX_AANVULLEN
+        or df.index[0] != vorig.index[0]
+        or df.index[p] != vorig.index[p]
+        or df["Close"].iloc[0] != vorig["Close"].iloc[0]
+        or df["Close"].iloc[p - 1] != vorig["Close"].iloc[p - 1]
+    ):
+        return None, None
+
+    # Kopie van de stroom, zodat de gecachete toestand nooit half bijgewerkt wordt gedeeld
+    stroom = copy.deepcopy(stroom) if stroom is not None else SamStroom.uit_historie(df.iloc[:oud])
+    ohlc = df[["Open", "High", "Low", "Close"]].iloc[p:].to_numpy(dtype="float64").tolist()
+    rijen = [stroom.herzie(*ohlc[0])] + [stroom.voeg_toe(*rij) for rij in ohlc[1:]]
+
+    nieuw = df.iloc[p:].copy()
+    for naam in SCORE_KOLOMMEN:
+        nieuw[naam] = np.array([rij[naam] for rij in rijen], dtype="float32")
+    resultaat = pd.concat([vorig.iloc[:p], nieuw])
+    return vul_sat_aan(resultaat, p), stroom
+
+
+# ✅ Ingang voor de app: df zoals uit fetch_data, resultaat met SAM-scores (lean) en SAT-kolommen
+# gesloten=True (scanner: alleen afgesloten bars) krijgt een eigen item, zodat app en scanner in één
+# proces elkaars frame niet steeds vervangen en het incrementele pad voor beide blijft werken
+def indicatoren(ticker, interval, df, gesloten=False):
+    standaard = is_standaard()
+    sleutel = (
+        "indicatoren", ticker, interval, gesloten, INDICATOR_VERSIE, True if standaard else register_sleutel()
+    )
+    afdruk = vingerafdruk(df)
+    gevonden, waarde = _cache.haal(sleutel)
+    if gevonden:
+        vorige_afdruk, vorig, stroom = waarde
+        if vorige_afdruk == afdruk:
+            return vorig.copy()
+        resultaat, stroom = _aanvullen(df, vorig, stroom) if standaard else (None, None)
+        if resultaat is not None:
+            _cache.zet(sleutel, (afdruk, resultaat, stroom))
+            zet_gedeeld("indicatoren", INDICATOR_VERSIE, (ticker, interval, afdruk), resultaat)
+            return resultaat.copy()
+
+    # 🗄️ Een andere replica kan deze bars al doorgerekend hebben (alleen standaardregister: de sleutel
+    # van een aangepast register bevat id's die buiten dit proces niets betekenen)
+    if standaard:
+        gevonden, resultaat = haal_gedeeld("indicatoren", INDICATOR_VERSIE, (ticker, interval, afdruk))
+        if gevonden:
+            _cache.zet(sleutel, (afdruk, resultaat, None))
+            return resultaat.copy()
+
+    resultaat = _volledig(df)
+    _cache.zet(sleutel, (afdruk, resultaat, None))  # de stroom wordt pas bij de eerste aanvulling opgebouwd
+    if standaard:
+        zet_gedeeld("indicatoren", INDICATOR_VERSIE, (ticker, interval, afdruk), resultaat)
+    return resultaat.copy()
@@ -0,0 +1,86 @@
+# koersbord.py
+import threading
+import time
+from ophalen import haal_op
+from marktklok import is_markt_open
+
+# 🔁 Eén proces-breed koersbord, ververst door een achtergrondthread
+VERVERS_SECONDEN = 60
+
+_koersen = {}          # ticker -> (last, open, change, tijdstip)
+_tickers = set()       # alle geregistreerde tickers (over alle tabs)
+_lock = threading.Lock()
+_thread = None
+
+
+# ✅ Gebundelde download van de weekkoers (zelfde bron als de oude dropdown)
+def ververs(tickers):
+    tickers = list(tickers)
+    if not tickers:
+        return
+    try:
+        data = haal_op(tickers, "1wk", period="1wk")
+    except Exception:
+        return
+
+    nu = time.time()
+    nieuw = {}
+    for ticker in tickers:
+        try:
+            last = float(data[ticker]["Close"].iloc[-1])
+            prev = float(data[ticker]["Open"].iloc[-1])
+            change = (last - prev) / prev * 100
+            nieuw[ticker] = (last, prev, change, nu)
+        except Exception:
+            continue
+    with _lock:
+        _koersen.update(nieuw)
+
+
+# ✅ Eén verversronde: open markten, plus tickers zonder koers (bv. mislukte eerste download) ongeacht handelstijd
+def _ververs_ronde():
+    with _lock:
+        tickers = list(_tickers)
+        zonder_koers = {t for t in tickers if t not in _koersen}
+    # Buiten handelstijd verandert de koers niet, dus alleen open markten en ontbrekende koersen
+    ververs([t for t in tickers if t in zonder_koers or is_markt_open(t)])
+
+
+def _ververs_lus():
+    while True:
+        time.sleep(VERVERS_SECONDEN)
+        _ververs_ronde()
+
+
+# ✅ Markt aanmelden; er wordt alleen (blokkerend) gewacht zolang een ticker nog geen koers heeft
+def registreer_markt(tickers_dict):
+    global _thread
+    with _lock:
+        _tickers.update(tickers_dict)
+        zonder_koers = [t for t in tickers_dict if t not in _koersen]
+        if _thread is None:
+            _thread = threading.Thread(target=_ververs_lus, name="koersbord", daemon=True)
+            _thread.start()
+    if zonder_koers:
+        ververs(zonder_koers)
+
+
+# ✅ Niet-blokkerend lezen voor dropdown, header en bot
+def lees_markt(tickers_dict):
+    with _lock:
+        koersen = dict(_koersen)
+
+    result = []
+    for ticker, naam in tickers_dict.items():
+        if ticker not in koersen:
+            continue
+        last, _, change, _ = koersen[ticker]
+        kleur = "#00FF00" if change > 0 else "#FF0000" if change < 0 else "#808080"
+        result.append((ticker, naam, last, change, kleur))
+    return result
+
+
+def laatste_koers(ticker):
+    with _lock:
+        koers = _koersen.get(ticker)
+    return koers[0] if koers else None
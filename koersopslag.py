@@ -0,0 +1,249 @@
+# koersopslag.py
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from dataproviders import bestandsnaam
+from herbemonstering import BASIS_INTERVAL, geldige_bars, herbemonster
+from marktklok import geldig_tot
+from ophalen import haal_op, haal_op_meerdere
+
+try:
+    import pyarrow  # noqa: F401 — parquet-engine, zonder valt de opslag terug op direct downloaden
+except ImportError:
+    pyarrow = None
+
+# 📁 Map voor de lokale bar-opslag (één Parquet-bestand per ticker + interval)
+OPSLAG_MAP = os.environ.get(
+    "SAM_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bars")
+)
+BULK_GROOTTE = 20    # aantal tickers per gebundelde download
+MIN_BARS = 30        # minder bars is te weinig voor de indicatoren
+
+# 🕓 Per (ticker, interval): tot wanneer de opgeslagen bars actueel zijn (volgens de marktklok), proces-breed
+_geldig_tot = {}
+
+
+def is_vers(ticker, interval):
+    return time.time() < _geldig_tot.get((ticker, interval), 0.0)
+
+
+def markeer_vers(ticker, interval):
+    _geldig_tot[(ticker, interval)] = geldig_tot(ticker, interval)
+
+
+# ✅ Pad per ticker + interval
+def opslag_pad(ticker, interval):
+    return os.path.join(OPSLAG_MAP, bestandsnaam(ticker, interval))
+
+
+# ✅ Lezen uit de opslag, optioneel alleen bepaalde kolommen (kolomprojectie)
+def lees_bars(ticker, interval, kolommen=None):
+    pad = opslag_pad(ticker, interval)
+    if pyarrow is None or not os.path.exists(pad):
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(pad, columns=kolommen)
+    except Exception:
+        return pd.DataFrame()
+
+
+def schrijf_bars(ticker, interval, df):
+    if pyarrow is None or df.empty:
+        return
+    os.makedirs(OPSLAG_MAP, exist_ok=True)
+    pad = opslag_pad(ticker, interval)
+    # Eigen tijdelijk bestand per proces en thread: sessies en de scanner schrijven soms tegelijk
+    tijdelijk = f"{pad}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_parquet(tijdelijk, compression="zstd")
+    os.replace(tijdelijk, pad)  # atomair, zodat een lezer nooit een half bestand ziet
+
+
+# ✅ Tijdzone van nieuwe bars gelijktrekken met de opgeslagen bars
+def _zelfde_tijdzone(bestaand, nieuw):
+    if bestaand.index.tz is not None and nieuw.index.tz is None:
+        nieuw.index = nieuw.index.tz_localize(bestaand.index.tz)
+    elif bestaand.index.tz is None and nieuw.index.tz is not None:
+        nieuw.index = nieuw.index.tz_localize(None)
+    elif bestaand.index.tz is not None:
+        nieuw.index = nieuw.index.tz_convert(bestaand.index.tz)
+    return nieuw
+
+
+# ✅ Nieuwe bars samenvoegen; bij dubbele tijdstempels wint de nieuwste download
+def voeg_bars_samen(bestaand, nieuw):
+    if bestaand.empty:
+        return nieuw
+    if nieuw.empty:
+        return bestaand
+    nieuw = _zelfde_tijdzone(bestaand, nieuw)
+    samen = pd.concat([bestaand, nieuw])
+    samen = samen[~samen.index.duplicated(keep="last")]
+    return samen.sort_index()
+
+
+# ✅ Delta-start: de voorlaatste opgeslagen bar (afgesloten) gaat mee als controlebar
+def delta_start(bestaand):
+    return bestaand.index[-2] if len(bestaand) > 1 else bestaand.index[-1]
+
+
+# ✅ Past de delta op de opslag? Na een split of dividend past de provider de hele historie aan;
+# dan heeft de controlebar een andere Close en moet alles opnieuw, niet samengevoegd
+def delta_past(bestaand, nieuw):
+    if len(bestaand) < 2:
+        return True
+    controle = bestaand.index[-2]
+    nieuw = _zelfde_tijdzone(bestaand, nieuw.copy())
+    if controle not in nieuw.index:
+        return False  # niet te controleren → veilig kiezen voor opnieuw ophalen
+    oud_close = float(bestaand["Close"].loc[controle])
+    nieuw_close = float(nieuw["Close"].loc[[controle]].iloc[-1])
+    return bool(np.isclose(oud_close, nieuw_close, rtol=1e-6, equal_nan=True))
+
+
+# ✅ Via de gedeelde ophaallaag (rate limiting, retries, samenvoegen van gelijke verzoeken)
+def download_bars(ticker, interval, period=None, start=None):
+    try:
+        return haal_op([ticker], interval, period=period, start=start).get(ticker, pd.DataFrame())
+    except Exception:
+        return pd.DataFrame()
+
+
+# ✅ Periode ("30d", "720d", "20y", "1wk", "1mo") als tijdsduur; None als die niet te lezen is
+def _periode_duur(period):
+    eenheden = {"d": 1, "wk": 7, "mo": 31, "y": 366}
+    for eenheid, dagen in eenheden.items():
+        if period and period.endswith(eenheid) and period[: -len(eenheid)].isdigit():
+            return pd.Timedelta(days=int(period[: -len(eenheid)]) * dagen)
+    return None
+
+
+# ✅ Ligt de opslag verder terug dan de periode (bv. 15m na weken stilstand)? Dan is een delta zinloos
+# (Yahoo geeft intraday maar een beperkt venster) en is de volledige periode even groot
+def delta_te_oud(bestaand, period):
+    duur = _periode_duur(period)
+    if duur is None:
+        return False
+    start = pd.Timestamp(delta_start(bestaand))
+    nu = pd.Timestamp.now(tz=start.tz) if start.tz is not None else pd.Timestamp.now()
+    return nu - start > duur
+
+
+# ✅ Incrementeel ophalen: alleen bars vanaf de laatst opgeslagen tijdstempel
+def haal_bars(ticker, interval, period):
+    if pyarrow is None:
+        return download_bars(ticker, interval, period=period)
+
+    bestaand = lees_bars(ticker, interval)
+    if not bestaand.empty and is_vers(ticker, interval):
+        return bestaand  # recent nog bijgewerkt (bv. door laad_markt) → geen netwerk nodig
+    if bestaand.empty or delta_te_oud(bestaand, period):
+        # Geen, onleesbare of verouderde opslag → volledige periode, opnieuw opbouwen
+        nieuw = download_bars(ticker, interval, period=period)
+        if not nieuw.empty:
+            bestaand = pd.DataFrame()
+    else:
+        # 🔁 Vanaf de voorlaatste bar: de laatste kan nog in vorming zijn geweest, de voorlaatste controleert
+        nieuw = download_bars(ticker, interval, start=delta_start(bestaand))
+        if nieuw.empty:
+            # Tijdelijk niets (rate limit, storing): opgeslagen bars houden en niet als vers markeren, zodat
+            # de volgende ronde de delta opnieuw probeert in plaats van de hele periode te downloaden
+            return bestaand
+        if not delta_past(bestaand, nieuw):
+            # Aangepaste historie (split/dividend): de controlebar wijkt af → volledige periode
+            nieuw = download_bars(ticker, interval, period=period)
+            if nieuw.empty:
+                return bestaand
+            if not delta_past(bestaand, nieuw):
+                bestaand = pd.DataFrame()  # historie aangepast: opnieuw opbouwen in plaats van samenvoegen
+
+    df = voeg_bars_samen(bestaand, nieuw)
+    if not nieuw.empty:
+        schrijf_bars(ticker, interval, df)
+        markeer_vers(ticker, interval)
+    return df
+
+
+# ✅ Gebundelde download voor een hele markt (bv. tabs_mapping["🇳🇱 AEX"])
+def laad_markt(tickers_dict, interval, period):
+    if pyarrow is None:
+        return
+    te_laden = [t for t in tickers_dict if not is_vers(t, interval)]
+    if not te_laden:
+        return
+
+    # 📦 Tickers zonder (bruikbare) opslag krijgen de volledige periode, de rest alleen een delta
+    opgeslagen = {t: lees_bars(t, interval, kolommen=["Close"]) for t in te_laden}
+    nieuw = [t for t in te_laden if opgeslagen[t].empty or delta_te_oud(opgeslagen[t], period)]
+    bestaand = sorted((t for t in te_laden if t not in nieuw), key=lambda t: delta_start(opgeslagen[t]))
+
+    blokken, verzoeken = [], []
+    for i in range(0, len(nieuw), BULK_GROOTTE):
+        blok = nieuw[i:i + BULK_GROOTTE]
+        blokken.append(blok)
+        verzoeken.append({"tickers": blok, "interval": interval, "period": period})
+    for i in range(0, len(bestaand), BULK_GROOTTE):
+        blok = bestaand[i:i + BULK_GROOTTE]
+        start = delta_start(opgeslagen[blok[0]])  # gesorteerd, dus de oudste controlebar van dit blok
+        blokken.append(blok)
+        verzoeken.append({"tickers": blok, "interval": interval, "start": start})
+
+    # ⚡ Alle blokken gelijktijdig, binnen de limiet van de provider
+    for blok, data in zip(blokken, haal_op_meerdere(verzoeken)):
+        _sla_bulk_op(blok, data, interval, period)
+
+
+def _sla_bulk_op(blok, data, interval, period):
+    for ticker in blok:
+        if ticker not in data:
+            continue  # niet gelukt → haal_bars probeert deze ticker later los
+        bestaand = lees_bars(ticker, interval)
+        if not bestaand.empty and delta_te_oud(bestaand, period):
+            bestaand = pd.DataFrame()  # verouderde opslag: de volledige periode vervangt die
+        elif not bestaand.empty and not delta_past(bestaand, data[ticker]):
+            continue  # aangepaste historie (split/dividend) → haal_bars haalt de volledige periode opnieuw
+        df = voeg_bars_samen(bestaand, data[ticker])
+        schrijf_bars(ticker, interval, df)
+        markeer_vers(ticker, interval)
+
+
+# 🔁 Interval naar periode (app en scanner gebruiken dezelfde historie)
+def bepaal_periode(interval):
+    if interval == "15m":
+        return "30d"
+    elif interval == "1h":
+        return "720d"
+    elif interval == "4h":
+        return "360d"
+    elif interval == "1d":
+        return "20y"
+    elif interval == "1wk":
+        return "20y"
+    elif interval == "1mo":
+        return "25y"
+    else:
+        return "25y"  # fallback
+
+
+# ✅ Bars voor een interval; grovere intervallen worden lokaal afgeleid van het basisinterval
+def haal_interval_bars(ticker, interval, period=None):
+    if interval in BASIS_INTERVAL:
+        basis = BASIS_INTERVAL[interval]
+        return herbemonster(haal_bars(ticker, basis, bepaal_periode(basis)), interval)
+    return haal_bars(ticker, interval, period or bepaal_periode(interval))
+
+
+# 🧹 Dataschoonmaak: foutieve rijen weg, datetime-index, NaN's per kolom gevuld; leeg bij onbruikbare data
+def schoon_bars(df):
+    if df is None or df.empty or "Close" not in df.columns or "Open" not in df.columns:
+        return pd.DataFrame()
+
+    df = df[geldige_bars(df)]
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index, errors="coerce")
+    df = df[~df.index.isna()].copy()
+
+    for col in ["Close", "Open", "High", "Low", "Volume"]:
+        df[col] = df[col].ffill().bfill()
+    return df
@@ -0,0 +1,147 @@
+# marktklok.py
+import math
+import time as _time
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# 🕘 Handelstijden per beurs (lokale tijd); feestdagen worden niet meegenomen
+BEURZEN = {
+    "US": ("America/New_York", time(9, 30), time(16, 0)),
+    "AS": ("Europe/Amsterdam", time(9, 0), time(17, 30)),
+    "PA": ("Europe/Paris", time(9, 0), time(17, 30)),
+    "BR": ("Europe/Brussels", time(9, 0), time(17, 30)),
+    "DE": ("Europe/Berlin", time(9, 0), time(17, 30)),
+    "MI": ("Europe/Rome", time(9, 0), time(17, 30)),
+    "MC": ("Europe/Madrid", time(9, 0), time(17, 30)),
+    "L": ("Europe/London", time(8, 0), time(16, 30)),
+}
+
+BAR_DUUR = {
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "4h": timedelta(hours=4),
+}
+
+MAX_GELDIG_OPEN = timedelta(minutes=15)  # tijdens de sessie vormt de laatste bar zich nog → hooguit tot de
+                                         # volgende kwartiergrens (vast raster, dus een stabiele cachesleutel)
+NA_SLUITING = timedelta(minutes=15)      # slotkoersen komen bij Yahoo met enige vertraging binnen
+VERTRAGING = timedelta(seconds=60)       # marge na een bargrens voordat de nieuwe bar beschikbaar is
+
+
+def beurs_van(ticker):
+    if ticker.endswith("-USD") or ticker.endswith("-EUR"):
+        return "CRYPTO"
+    if "." in ticker:
+        return ticker.rsplit(".", 1)[1] if ticker.rsplit(".", 1)[1] in BEURZEN else "US"
+    return "US"
+
+
+def is_markt_open(ticker, nu=None):
+    beurs = beurs_van(ticker)
+    if beurs == "CRYPTO":
+        return True
+    nu = nu or datetime.now(timezone.utc)
+    tz, opening, sluiting = BEURZEN[beurs]
+    lokaal = nu.astimezone(ZoneInfo(tz))
+    start = datetime.combine(lokaal.date(), opening, ZoneInfo(tz))
+    eind = datetime.combine(lokaal.date(), sluiting, ZoneInfo(tz)) + NA_SLUITING
+    return lokaal.weekday() < 5 and start <= lokaal < eind
+
+
+# ✅ Eerstvolgende grens op het vaste raster van MAX_GELDIG_OPEN (kloktijd), niet nu + 15 min
+def _volgende_rastergrens(nu):
+    duur = MAX_GELDIG_OPEN.total_seconds()
+    return datetime.fromtimestamp((math.floor(nu.timestamp() / duur) + 1) * duur, timezone.utc)
+
+
+# ✅ Eerstvolgende bargrens in UTC voor crypto (24/7)
+def _volgende_grens_crypto(nu, interval):
+    if interval in BAR_DUUR:
+        duur = BAR_DUUR[interval].total_seconds()
+        return datetime.fromtimestamp((math.floor(nu.timestamp() / duur) + 1) * duur, timezone.utc)
+    dag = datetime.combine(nu.date(), time(0), timezone.utc)
+    if interval == "1wk":
+        return dag + timedelta(days=7 - nu.weekday())
+    if interval == "1mo":
+        return (dag.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return dag + timedelta(days=1)
+
+
+# ✅ Eerstvolgende bargrens voor een beurs: binnen de sessie de volgende bar, anders de volgende opening
+def _volgende_grens_beurs(nu, interval, beurs):
+    tz, opening, sluiting = BEURZEN[beurs]
+    zone = ZoneInfo(tz)
+    lokaal = nu.astimezone(zone)
+    start = datetime.combine(lokaal.date(), opening, zone)
+    eind = datetime.combine(lokaal.date(), sluiting, zone)
+
+    if lokaal.weekday() < 5 and start <= lokaal < eind + NA_SLUITING:
+        if lokaal >= eind:
+            return eind + NA_SLUITING
+        if interval in BAR_DUUR:
+            duur = BAR_DUUR[interval]
+            k = math.floor((lokaal - start) / duur) + 1
+            return min(start + k * duur, eind)
+        return eind
+
+    # 💤 Beurs dicht: pas bij de volgende opening kan er nieuwe data zijn
+    dag = lokaal.date() if lokaal < start else lokaal.date() + timedelta(days=1)
+    while dag.weekday() >= 5:
+        dag += timedelta(days=1)
+    return datetime.combine(dag, opening, zone)
+
+
+# ✅ Laatste kalenderdag van de periode waarin een dag-, week- of maandbar valt
+def _laatste_dag(dag, interval):
+    if interval == "1wk":
+        return dag + timedelta(days=6 - dag.weekday())
+    if interval == "1mo":
+        return (dag.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return dag
+
+
+# ✅ Moment waarop de bar die op bar_start begint definitief is (naïeve tijden gelden als beurstijd, crypto UTC)
+def bar_einde(ticker, interval, bar_start):
+    beurs = beurs_van(ticker)
+    zone = timezone.utc if beurs == "CRYPTO" else ZoneInfo(BEURZEN[beurs][0])
+    if bar_start.tzinfo is None:
+        bar_start = bar_start.replace(tzinfo=zone)
+    lokaal = datetime.fromtimestamp(bar_start.timestamp(), zone)
+
+    if beurs == "CRYPTO":
+        if interval in BAR_DUUR:
+            return lokaal + BAR_DUUR[interval]
+        return datetime.combine(_laatste_dag(lokaal.date(), interval) + timedelta(days=1), time(0), zone)
+
+    # 🕔 Een bar die tot de sluiting loopt is pas na de nalevering van de slotkoers definitief
+    if interval in BAR_DUUR:
+        einde = lokaal + BAR_DUUR[interval]
+        sluiting = datetime.combine(lokaal.date(), BEURZEN[beurs][2], zone)
+        return einde if einde < sluiting else sluiting + NA_SLUITING
+    dag = _laatste_dag(lokaal.date(), interval)
+    while dag.weekday() >= 5:
+        dag -= timedelta(days=1)
+    return datetime.combine(dag, BEURZEN[beurs][2], zone) + NA_SLUITING
+
+
+# ✅ Is de bar afgesloten? Een bar in vorming kan binnen dezelfde bar nog van richting wisselen
+def bar_gesloten(ticker, interval, bar_start, nu=None):
+    nu = nu or datetime.now(timezone.utc)
+    return nu >= bar_einde(ticker, interval, bar_start)
+
+
+# ✅ Tijdstip (epoch-seconden) tot wanneer gecachete data voor ticker + interval geldig blijft
+def geldig_tot(ticker, interval, nu=None):
+    nu = nu or datetime.now(timezone.utc)
+    beurs = beurs_van(ticker)
+    if beurs == "CRYPTO":
+        grens = min(_volgende_grens_crypto(nu, interval), _volgende_rastergrens(nu))
+    elif is_markt_open(ticker, nu):
+        grens = min(_volgende_grens_beurs(nu, interval, beurs), _volgende_rastergrens(nu))
+    else:
+        grens = _volgende_grens_beurs(nu, interval, beurs)
+    return int((grens + VERTRAGING).timestamp())
+
+
+def is_geldig(geldig_tot_epoch):
+    return _time.time() < geldig_tot_epoch
@@ -0,0 +1,159 @@
+# ophalen.py
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from functools import partial
+from dataproviders import ACTIEVE_PROVIDER, download
+from symboolstatus import filter_gezond, registreer_fout, registreer_succes
+
+# 🚦 Token-bucket per host: (verzoeken per seconde, maximale burst)
+LIMIETEN = {
+    "yfinance": (2.0, 5),
+    "alpaca": (3.0, 10),
+    "replay": (1000.0, 1000),
+}
+POGINGEN = 3            # totaal aantal pogingen per verzoek
+BACKOFF_SECONDEN = 1.0  # basiswachttijd, verdubbelt per nieuwe poging
+POGING_TIMEOUT = 30     # een hangende providerdownload telt na zoveel seconden als mislukte poging
+WACHT_TIMEOUT = 180     # maximale wachttijd van een sessie op het resultaat (incl. rate limiting)
+
+
+class TokenBucket:
+    def __init__(self, tempo, capaciteit):
+        self.tempo = tempo
+        self.capaciteit = capaciteit
+        self.tokens = float(capaciteit)
+        self.laatst = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def neem(self):
+        async with self.lock:
+            while True:
+                nu = time.monotonic()
+                self.tokens = min(self.capaciteit, self.tokens + (nu - self.laatst) * self.tempo)
+                self.laatst = nu
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.tempo)
+
+
+# 🔁 Eén event-loop in een achtergrondthread, gedeeld door alle Streamlit-sessies
+_loop = None
+_loop_lock = threading.Lock()
+_buckets = {}
+_lopend = {}  # sleutel -> Future van de download die al onderweg is (single-flight)
+
+
+def _event_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="ophalen", daemon=True).start()
+    return _loop
+
+
+def _bucket(provider):
+    if provider not in _buckets:
+        _buckets[provider] = TokenBucket(*LIMIETEN.get(provider, (1.0, 1)))
+    return _buckets[provider]
+
+
+async def _download_met_retries(tickers, interval, period, start, provider):
+    loop = asyncio.get_running_loop()
+    for poging in range(POGINGEN):
+        await _bucket(provider).neem()
+        try:
+            # De thread zelf kan niet worden afgebroken, maar het wachten erop (en de single-flight) wel
+            data = await asyncio.wait_for(
+                loop.run_in_executor(
+                    None, partial(download, tickers, interval, period=period, start=start, provider=provider)
+                ),
+                POGING_TIMEOUT,
+            )
+            if data:
+                return data
+            fout = None  # leeg resultaat: bij Yahoo meestal throttling, dus opnieuw proberen
+        except asyncio.TimeoutError:
+            fout = TimeoutError(f"download hing langer dan {POGING_TIMEOUT} s")
+        except Exception as e:
+            fout = e
+        if poging < POGINGEN - 1:
+            await asyncio.sleep(BACKOFF_SECONDEN * 2 ** poging * (1 + random.random() / 2))
+    if fout is not None:
+        raise fout
+    return {}
+
+
+# ✅ Resultaat per symbool bijhouden, zodat kapotte symbolen in de negatieve cache komen
+async def _download_en_registreer(tickers, interval, period, start, provider):
+    try:
+        data = await _download_met_retries(tickers, interval, period, start, provider)
+    except Exception as e:
+        for ticker in tickers:
+            registreer_fout(ticker, str(e))
+        raise
+    for ticker in tickers:
+        if ticker in data:
+            registreer_succes(ticker)
+        else:
+            registreer_fout(ticker, "geen data ontvangen")
+    return data
+
+
+# Single-flight opruimen; de fout wordt altijd opgehaald, ook als alle wachtenden al zijn afgehaakt
+def _afgerond(sleutel, taak):
+    _lopend.pop(sleutel, None)
+    if not taak.cancelled():
+        taak.exception()
+
+
+# ✅ Identieke verzoeken die al lopen worden samengevoegd tot één download
+async def haal_op_async(tickers, interval, period=None, start=None, provider=None):
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    provider = provider or ACTIEVE_PROVIDER
+    tickers = filter_gezond(tickers)  # geblokkeerde symbolen niet meer laten wachten
+    if not tickers:
+        return {}
+    sleutel = (tuple(tickers), interval, period, start, provider)
+
+    if sleutel not in _lopend:
+        taak = asyncio.ensure_future(_download_en_registreer(tickers, interval, period, start, provider))
+        _lopend[sleutel] = taak
+        taak.add_done_callback(partial(_afgerond, sleutel))
+    return await asyncio.shield(_lopend[sleutel])
+
+
+# ✅ Wachten met een bovengrens; bij een timeout wordt het verzoek van deze sessie geannuleerd
+# (de gedeelde download loopt door en eindigt zelf via POGING_TIMEOUT) en volgt de gewone foutroute
+def _wacht(coro):
+    toekomst = asyncio.run_coroutine_threadsafe(coro, _event_loop())
+    try:
+        return toekomst.result(timeout=WACHT_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        if toekomst.done():
+            return toekomst.result()  # eigen uitkomst of fout van de download, geen wachttimeout
+        toekomst.cancel()
+        raise TimeoutError(f"geen resultaat binnen {WACHT_TIMEOUT} s") from None
+
+
+# ✅ Synchrone ingangen voor de Streamlit-code (blokkeert alleen de aanroepende sessie)
+def haal_op(tickers, interval, period=None, start=None, provider=None):
+    return _wacht(haal_op_async(tickers, interval, period=period, start=start, provider=provider))
+
+
+# Meerdere verzoeken tegelijk; mislukte verzoeken geven een lege dict
+def haal_op_meerdere(verzoeken):
+    async def alles():
+        taken = [haal_op_async(**verzoek) for verzoek in verzoeken]
+        resultaten = await asyncio.gather(*taken, return_exceptions=True)
+        return [r if isinstance(r, dict) else {} for r in resultaten]
+
+    try:
+        return _wacht(alles())
+    except TimeoutError:
+        return [{} for _ in verzoeken]
@@ -0,0 +1,254 @@
+# sam_componenten.py
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from di_indicator import di_panel
+
+# 🧩 Register van SAM-componenten en hun tussenresultaten. Elke knoop declareert zijn invoer, de
+# parameters waar hij van afhangt en zijn eigen opwarming (bars tot de eerste geldige waarde).
+# evalueer() rekent alleen de knopen uit die de gevraagde uitvoer nodig heeft, één keer per reeks.
+# Een component toevoegen of vervangen = @component met dezelfde naam (en SAM_DELEN aanpassen).
+# Alle arrays zijn 2-D (bars × tickers), zodat enkelvoudige reeksen en het panel dezelfde code delen.
+
+# 🎛️ Standaardparameters van SAM (overschrijfbaar per aanroep, zie sam_sweep.py)
+SAM_PARAMS = {
+    "wma_kort": 6, "wma_midden": 18, "wma_lang": 35, "wma_trend": 80,  # SAMT: kort/trend, SAMG: midden/lang
+    "helling": 1.0015,                                                # SAMG: band rond de vorige WMA
+    "di_zwak": 10.0, "di_sterk": 30.0,                                # SAMD: epsilon-drempels
+    "macd_snel": 12, "macd_traag": 26, "macd_signaal": 9,             # SAMM
+    "trix": 15,                                                       # SAMX
+}
+BRONNEN = ("Open", "High", "Low", "Close")
+SAM_DELEN = ["SAMK", "SAMG", "SAMT", "SAMD", "SAMM", "SAMX"]
+
+REGISTER = {}
+_alle_params = {}  # naam -> parameters van de knoop en al zijn invoer (zie alle_params)
+
+
+def component(naam, invoer=(), params=(), opwarming=0):
+    def decorator(functie):
+        REGISTER[naam] = {"invoer": tuple(invoer), "params": tuple(params), "opwarming": opwarming, "bereken": functie}
+        _alle_params.clear()
+        return functie
+    return decorator
+
+
+# --- Array-hulpjes ---
+# De gewogen som wordt term voor term opgeteld (vaste volgorde, geen BLAS), zodat elke bar exact dezelfde
+# uitkomst geeft, ongeacht de lengte of vorm van de invoer; sam_stream rekent per bar in dezelfde volgorde.
+def _gewogen_som(vensters, weights):
+    som = np.zeros(vensters.shape[:-1])
+    for j, gewicht in enumerate(weights):
+        som += vensters[..., j] * gewicht
+    return som / weights.sum()
+
+
+def _shift2d(arr, k=1):
+    uit = np.full_like(arr, np.nan)
+    uit[k:] = arr[:-k]
+    return uit
+
+
+def _wma2d(arr, window):
+    weights = np.arange(1, window + 1, dtype="float64")
+    uit = np.full_like(arr, np.nan)
+    if len(arr) >= window:
+        uit[window - 1:] = _gewogen_som(sliding_window_view(arr, window, axis=0), weights)
+    return uit
+
+
+def _ema2d(arr, span, min_periods=0):
+    return pd.DataFrame(arr).ewm(span=span, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+
+# --- SAMK: candlestick score op basis van patronen Open/Close (eerste passende wint) ---
+component("vorige_close", ["Close"], opwarming=1)(lambda p, close: _shift2d(close, 1))
+component("voorvorige_close", ["Close"], opwarming=2)(lambda p, close: _shift2d(close, 2))
+component("vorige_open", ["Open"], opwarming=1)(lambda p, open_: _shift2d(open_, 1))
+component("c1", ["Close", "Open"])(lambda p, close, open_: close > open_)
+component("c2", ["vorige_close", "vorige_open"])(lambda p, vc, vo: vc > vo)
+component("c3", ["Close", "vorige_close"])(lambda p, close, vc: close > vc)
+component("c4", ["vorige_close", "voorvorige_close"])(lambda p, vc, vvc: vc > vvc)
+component("c5", ["Close", "Open"])(lambda p, close, open_: close < open_)
+component("c6", ["vorige_close", "vorige_open"])(lambda p, vc, vo: vc < vo)
+component("c7", ["Close", "vorige_close"])(lambda p, close, vc: close < vc)
+component("c8", ["vorige_close", "voorvorige_close"])(lambda p, vc, vvc: vc < vvc)
+
+
+@component("SAMK", ["c1", "c2", "c3", "c4", "c5", "c6", "c7", "c8"])
+def samk(p, c1, c2, c3, c4, c5, c6, c7, c8):
+    return np.select(
+        [c1 & c2 & c3 & c4, c1 & c3 & c4, c1 & c3, c1 | c3,
+         c5 & c6 & c7 & c8, c5 & c7 & c8, c5 & c7, c5 | c7],
+        [1.25, 1.0, 0.5, 0.25, -1.25, -1.0, -0.5, -0.25], default=0.0,
+    )
+
+
+# --- WMA's: één knoop per rol, met de verschoven reeks ernaast ---
+for _rol in ("kort", "midden", "lang", "trend"):
+    _param = f"wma_{_rol}"
+    component(f"WMA_{_rol}", ["Close"], [_param], opwarming=lambda p, _param=_param: p[_param] - 1)(
+        lambda p, close, _param=_param: _wma2d(close, p[_param])
+    )
+    component(f"WMA_{_rol}_s", [f"WMA_{_rol}"], opwarming=1)(lambda p, wma: _shift2d(wma))
+
+
+# --- SAMG (WMA-midden/lang trend en crossovers); de laatste passende regel wint ---
+@component("SAMG", ["WMA_midden", "WMA_midden_s", "WMA_lang", "WMA_lang_s"], ["helling"])
+def samg(p, m, m_s, l, l_s):
+    h = p["helling"]
+    return np.select(
+        [(m_s > l_s) & (m < l),
+         (m_s < l_s) & (m > l),
+         (m < m_s / h) & (m <= m_s),
+         (m > m_s / h) & (m <= m_s),
+         (m < m_s * h) & (m > m_s),
+         (m > m_s * h) & (m > m_s)],
+        [-0.75, 0.75, -0.5, 0.5, -0.5, 0.5], default=0.0,
+    )
+
+
+# --- SAMT (WMA-kort t.o.v. WMA-trend); de laatste passende regel wint ---
+@component("SAMT", ["WMA_kort", "WMA_kort_s", "WMA_trend"])
+def samt(p, k, k_s, t):
+    return np.select(
+        [(k <= k_s) & (k > t),
+         (k <= k_s) & (k <= t),
+         (k > k_s) & (k <= t),
+         (k > k_s) & (k > t)],
+        [-0.5, -0.75, 0.25, 0.5], default=0.0,
+    )
+
+
+# --- SAMD op basis van DI+ en DI- (Wilder, window 14; de eerste 15 bars zijn 0) ---
+component("DI", ["High", "Low", "Close"], opwarming=15)(lambda p, high, low, close: di_panel(high, low, close, 14))
+component("DI_PLUS", ["DI"])(lambda p, di: di[0])
+component("DI_MINUS", ["DI"])(lambda p, di: di[1])
+
+
+@component("SAMD", ["DI_PLUS", "DI_MINUS"], ["di_zwak", "di_sterk"])
+def samd(p, di_plus, di_minus):
+    zwak, sterk = p["di_zwak"], p["di_sterk"]
+    return np.select(
+        [(di_minus > di_plus) & (di_plus > zwak),
+         (di_plus > di_minus) & (di_minus > zwak),
+         (di_minus > sterk) & (di_plus <= zwak),
+         (di_plus > sterk) & (di_minus <= zwak)],
+        [-0.5, 0.5, -0.75, 0.75], default=0.0,
+    )
+
+
+# --- SAMM: MACD(traag, snel, signaal) crossovers (eerste passende wint) ---
+component("EMA_snel", ["Close"], ["macd_snel"], opwarming=lambda p: p["macd_snel"] - 1)(
+    lambda p, close: _ema2d(close, p["macd_snel"], p["macd_snel"])
+)
+component("EMA_traag", ["Close"], ["macd_traag"], opwarming=lambda p: p["macd_traag"] - 1)(
+    lambda p, close: _ema2d(close, p["macd_traag"], p["macd_traag"])
+)
+component("MACD", ["EMA_snel", "EMA_traag"])(lambda p, snel, traag: snel - traag)
+component("SIGNAL", ["MACD"], ["macd_signaal"], opwarming=lambda p: p["macd_signaal"] - 1)(
+    lambda p, macd: _ema2d(macd, p["macd_signaal"], p["macd_signaal"])
+)
+component("MACD_s", ["MACD"], opwarming=1)(lambda p, macd: _shift2d(macd))
+component("SIGNAL_s", ["SIGNAL"], opwarming=1)(lambda p, signal: _shift2d(signal))
+
+
+@component("SAMM", ["MACD", "SIGNAL", "MACD_s", "SIGNAL_s"])
+def samm(p, macd, signal, vorige_macd, vorige_signal):
+    return np.select(
+        [(vorige_macd < vorige_signal) & (macd > signal), macd > signal,
+         (vorige_macd > vorige_signal) & (macd < signal), macd <= signal],
+        [1.0, 0.5, -1.0, -0.5], default=0.0,
+    )
+
+
+# --- SAMX op basis van TRIX (drievoudige EMA, geldig vanaf de eerste bar) ---
+@component("TRIX", ["Close"], ["trix"], opwarming=1)
+def trix(p, close):
+    ema3 = _ema2d(_ema2d(_ema2d(close, p["trix"]), p["trix"]), p["trix"])
+    vorige_ema3 = _shift2d(ema3)
+    return (ema3 - vorige_ema3) / vorige_ema3 * 100
+
+
+component("TRIX_PREV", ["TRIX"], opwarming=1)(lambda p, trix: _shift2d(trix))
+
+
+@component("SAMX", ["TRIX", "TRIX_PREV"])
+def samx(p, trix, trix_prev):
+    return np.select(
+        [(trix < 0) & (trix >= trix_prev), (trix < 0) & (trix < trix_prev),
+         (trix > 0) & (trix <= trix_prev), (trix > 0) & (trix > trix_prev)],
+        [-0.5, -0.75, 0.5, 0.75], default=0.0,
+    )
+
+
+# --- Totale SAM: som van de delen, in vaste volgorde ---
+@component("SAM", SAM_DELEN)
+def sam(p, *delen):
+    totaal = delen[0]
+    for deel in delen[1:]:
+        totaal = totaal + deel
+    return totaal
+
+
+# --- Afhankelijkheidsgraaf ---
+# ✅ Alle parameters waar een knoop (via zijn invoer) van afhangt: samen de memo-sleutel
+def alle_params(naam):
+    if naam in BRONNEN:
+        return ()
+    if naam not in _alle_params:
+        knoop = REGISTER[naam]
+        params = set(knoop["params"])
+        for invoer in knoop["invoer"]:
+            params.update(alle_params(invoer))
+        _alle_params[naam] = tuple(sorted(params))
+    return _alle_params[naam]
+
+
+# ✅ Aantal bars voordat een knoop zijn eerste geldige waarde heeft (eigen opwarming + langste invoer)
+def opwarming(naam, params=None):
+    if naam in BRONNEN:
+        return 0
+    p = {**SAM_PARAMS, **(params or {})}
+    knoop = REGISTER[naam]
+    eigen = knoop["opwarming"](p) if callable(knoop["opwarming"]) else knoop["opwarming"]
+    return eigen + max((opwarming(i, p) for i in knoop["invoer"]), default=0)
+
+
+# ✅ Alleen de gevraagde uitvoer (en wat die nodig heeft) uitrekenen.
+# bron: {"Open", "High", "Low", "Close"} → 2-D arrays; tussen: memo per reeks, mag over aanroepen
+# met andere params gedeeld worden (de sleutel bevat de params waar de knoop van afhangt).
+def evalueer(namen, bron, params=None, tussen=None):
+    p = {**SAM_PARAMS, **(params or {})}
+    tussen = {} if tussen is None else tussen
+
+    def waarde(naam):
+        if naam in BRONNEN:
+            return bron[naam]
+        sleutel = (naam,) + tuple(p[k] for k in alle_params(naam))
+        if sleutel not in tussen:
+            knoop = REGISTER[naam]
+            tussen[sleutel] = knoop["bereken"](p, *(waarde(i) for i in knoop["invoer"]))
+        return tussen[sleutel]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {naam: waarde(naam) for naam in namen}
+
+
+# --- Standaardregister ---
+# ✅ Sleutel van het register en de parameters zoals ze nu zijn: verandert zodra een component wordt
+# vervangen of toegevoegd of SAM_PARAMS wijzigt
+def register_sleutel():
+    return (
+        tuple(sorted(SAM_PARAMS.items())),
+        tuple((naam, id(k["bereken"]), k["invoer"], k["params"]) for naam, k in REGISTER.items()),
+    )
+
+
+_STANDAARD = register_sleutel()
+
+
+# ✅ Rekent het register nog met de standaardcomponenten en -parameters? Alleen dan mag
+# sam_stream.SamStroom (die de regels met vaste parameters nabouwt) de volledige berekening vervangen.
+def is_standaard():
+    return register_sleutel() == _STANDAARD
@@ -0,0 +1,254 @@
+# sam_stream.py
+import copy
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+from di_indicator import DIStaat
+
+# 🔁 Incrementele SAM: per nieuwe (of herziene) bar alle componenten in O(1) bijwerken.
+# De regels en randgevallen volgen calculate_sam in sam_indicator.py exact.
+
+COMPONENTEN = ["SAMK", "SAMG", "SAMT", "SAMD", "SAMM", "SAMX"]
+
+
+def _nan(x):
+    return x != x
+
+
+# ✅ EMA zoals pandas ewm(span, adjust=False): zelfde rekenvolgorde, dus bit-gelijk
+class EmaStaat:
+    def __init__(self, span, min_periods=0):
+        self.alpha = 2.0 / (span + 1.0)
+        self.factor = 1.0 - self.alpha
+        self.min_periods = max(min_periods, 1)
+        self.gewogen = math.nan
+        self.oud_gewicht = 1.0
+        self.waarnemingen = 0
+
+    def update(self, x):
+        if self.waarnemingen == 0:
+            if not _nan(x):
+                self.gewogen = x
+                self.waarnemingen = 1
+        else:
+            self.oud_gewicht *= self.factor
+            if not _nan(x):
+                self.waarnemingen += 1
+                if self.gewogen != x:
+                    self.gewogen = ((self.oud_gewicht * self.gewogen) + (self.alpha * x)) / (
+                        self.oud_gewicht + self.alpha
+                    )
+                self.oud_gewicht = 1.0
+        return self.gewogen if self.waarnemingen >= self.min_periods else math.nan
+
+
+# ✅ EMA over een hele reeks (pandas) plus de EmaStaat aan het eind ervan; de reeks mag alleen
+# aan het begin NaN bevatten (zoals MACD vóór 26 bars)
+def _ema_reeks(waarden, span, min_periods=0):
+    staat = EmaStaat(span, min_periods)
+    ruw = pd.Series(waarden).ewm(span=span, adjust=False).mean().to_numpy(copy=True)
+    geldig = ~np.isnan(waarden)
+    staat.waarnemingen = int(geldig.sum())
+    if staat.waarnemingen:
+        staat.gewogen = float(ruw[-1])
+    ruw[np.cumsum(geldig) < staat.min_periods] = np.nan
+    return ruw, staat
+
+
+# Zelfde optelvolgorde als weighted_moving_average, dus bit-gelijk
+def _wma(closes, window):
+    if len(closes) < window:
+        return math.nan
+    som = 0.0
+    for gewicht, x in enumerate(list(closes)[-window:], start=1):
+        som += x * float(gewicht)
+    return som / (window * (window + 1) / 2)
+
+
+class SamStroom:
+    def __init__(self):
+        self.closes = deque(maxlen=80)
+        self.vorige_open = math.nan
+        self.vorige_close = math.nan
+        self.voorvorige_close = math.nan
+        self.vorige_wma = {6: math.nan, 18: math.nan, 35: math.nan}
+        self.di = DIStaat(14)
+        self.ema_fast = EmaStaat(12, 12)
+        self.ema_slow = EmaStaat(26, 26)
+        self.ema_signal = EmaStaat(9, 9)
+        self.vorige_macd = math.nan
+        self.vorige_signal = math.nan
+        self.trix_ema = [EmaStaat(15), EmaStaat(15), EmaStaat(15)]
+        self.vorige_ema3 = math.nan
+        self.vorige_trix = math.nan
+        self._voor_laatste = None  # toestand vóór de laatste bar, voor herzie()
+
+    # ✅ Seeden met historie (DataFrame met Open/High/Low/Close)
+    # De toestand vóór de laatste bar wordt in één vectorpass opgebouwd (EMA's via pandas, DI via
+    # DIStaat.uit_reeks); de laatste bar gaat via voeg_toe, zodat herzie() meteen werkt.
+    @classmethod
+    def uit_historie(cls, df):
+        stroom = cls()
+        ohlc = np.column_stack([df[k].to_numpy(dtype="float64") for k in ("Open", "High", "Low", "Close")])
+        if len(ohlc) < 3 or np.isnan(ohlc).any():
+            # Korte of onvolledige historie: bar voor bar, zodat NaN-randgevallen gelijk blijven
+            for rij in ohlc[:-1].tolist():
+                stroom._stap(*rij)
+            if len(ohlc):
+                stroom.voeg_toe(*ohlc[-1].tolist())
+            return stroom
+
+        o, h, l, c = (ohlc[:-1, j] for j in range(4))
+        stroom.closes.extend(c[-80:].tolist())
+        stroom.vorige_open, stroom.vorige_close, stroom.voorvorige_close = float(o[-1]), float(c[-1]), float(c[-2])
+        stroom.vorige_wma = {n: _wma(stroom.closes, n) for n in (6, 18, 35)}
+        stroom.di = DIStaat.uit_reeks(h, l, c, 14)
+
+        fast, stroom.ema_fast = _ema_reeks(c, 12, 12)
+        slow, stroom.ema_slow = _ema_reeks(c, 26, 26)
+        macd = fast - slow
+        signal, stroom.ema_signal = _ema_reeks(macd, 9, 9)
+        stroom.vorige_macd, stroom.vorige_signal = float(macd[-1]), float(signal[-1])
+
+        ema3 = c
+        for i in range(3):
+            ema3, stroom.trix_ema[i] = _ema_reeks(ema3, 15)
+        stroom.vorige_ema3 = float(ema3[-1])
+        stroom.vorige_trix = float((ema3[-1] - ema3[-2]) / ema3[-2] * 100)
+
+        stroom.voeg_toe(*ohlc[-1].tolist())
+        return stroom
+
+    # ✅ Nieuwe bar toevoegen
+    def voeg_toe(self, open_, high, low, close):
+        self._voor_laatste = copy.deepcopy({k: v for k, v in self.__dict__.items() if k != "_voor_laatste"})
+        return self._stap(open_, high, low, close)
+
+    # ✅ De laatste (nog vormende) bar vervangen door nieuwe waarden
+    def herzie(self, open_, high, low, close):
+        if self._voor_laatste is None:
+            raise ValueError("Er is nog geen bar om te herzien.")
+        bewaard = self._voor_laatste
+        self.__dict__.update(copy.deepcopy(bewaard))
+        uitkomst = self._stap(open_, high, low, close)
+        self._voor_laatste = bewaard
+        return uitkomst
+
+    def _stap(self, open_, high, low, close):
+        c1 = close > open_
+        c2 = self.vorige_close > self.vorige_open
+        c3 = close > self.vorige_close
+        c4 = self.vorige_close > self.voorvorige_close
+        c5 = close < open_
+        c6 = self.vorige_close < self.vorige_open
+        c7 = close < self.vorige_close
+        c8 = self.vorige_close < self.voorvorige_close
+
+        # --- SAMK: eerste passende patroon wint ---
+        if c1 and c2 and c3 and c4:
+            samk = 1.25
+        elif c1 and c3 and c4:
+            samk = 1.0
+        elif c1 and c3:
+            samk = 0.5
+        elif c1 or c3:
+            samk = 0.25
+        elif c5 and c6 and c7 and c8:
+            samk = -1.25
+        elif c5 and c7 and c8:
+            samk = -1.0
+        elif c5 and c7:
+            samk = -0.5
+        elif c5 or c7:
+            samk = -0.25
+        else:
+            samk = 0.0
+
+        # --- WMA's (SAMG en SAMT) ---
+        self.closes.append(close)
+        wma6, wma18, wma35, wma80 = (_wma(self.closes, n) for n in (6, 18, 35, 80))
+        wma6_s, wma18_s, wma35_s = self.vorige_wma[6], self.vorige_wma[18], self.vorige_wma[35]
+        self.vorige_wma = {6: wma6, 18: wma18, 35: wma35}
+
+        # SAMG: zoals de opeenvolgende df.loc-toewijzingen, de laatste passende regel wint
+        samg = 0.0
+        if wma18 > wma18_s * 1.0015 and wma18 > wma18_s:
+            samg = 0.5
+        if wma18 < wma18_s * 1.0015 and wma18 > wma18_s:
+            samg = -0.5
+        if wma18 > wma18_s / 1.0015 and wma18 <= wma18_s:
+            samg = 0.5
+        if wma18 < wma18_s / 1.0015 and wma18 <= wma18_s:
+            samg = -0.5
+        if wma18_s < wma35_s and wma18 > wma35:
+            samg = 0.75
+        if wma18_s > wma35_s and wma18 < wma35:
+            samg = -0.75
+
+        samt = 0.0
+        if wma6 > wma6_s and wma6 > wma80:
+            samt = 0.5
+        if wma6 > wma6_s and wma6 <= wma80:
+            samt = 0.25
+        if wma6 <= wma6_s and wma6 <= wma80:
+            samt = -0.75
+        if wma6 <= wma6_s and wma6 > wma80:
+            samt = -0.5
+
+        # --- SAMD: DI+ / DI- ---
+        di_plus, di_minus = self.di.update(high, low, close)
+        samd = 0.0
+        if di_plus > 30.0 and di_minus <= 10.0:
+            samd = 0.75
+        if di_minus > 30.0 and di_plus <= 10.0:
+            samd = -0.75
+        if di_plus > di_minus and di_minus > 10.0:
+            samd = 0.5
+        if di_minus > di_plus and di_plus > 10.0:
+            samd = -0.5
+
+        # --- SAMM: MACD-crossovers (np.select: eerste passende wint) ---
+        fast = self.ema_fast.update(close)
+        slow = self.ema_slow.update(close)
+        macd = fast - slow
+        signal = self.ema_signal.update(macd)
+        if self.vorige_macd < self.vorige_signal and macd > signal:
+            samm = 1.0
+        elif macd > signal:
+            samm = 0.5
+        elif self.vorige_macd > self.vorige_signal and macd < signal:
+            samm = -1.0
+        elif macd <= signal:
+            samm = -0.5
+        else:
+            samm = 0.0
+        self.vorige_macd, self.vorige_signal = macd, signal
+
+        # --- SAMX: TRIX ---
+        ema3 = close
+        for ema in self.trix_ema:
+            ema3 = ema.update(ema3)
+        trix = (ema3 - self.vorige_ema3) / self.vorige_ema3 * 100
+        trix_prev = self.vorige_trix
+        self.vorige_ema3, self.vorige_trix = ema3, trix
+        samx = 0.0
+        if trix > 0 and trix > trix_prev:
+            samx = 0.75
+        if trix > 0 and trix <= trix_prev:
+            samx = 0.5
+        if trix < 0 and trix < trix_prev:
+            samx = -0.75
+        if trix < 0 and trix >= trix_prev:
+            samx = -0.5
+
+        self.voorvorige_close, self.vorige_close, self.vorige_open = self.vorige_close, close, open_
+
+        componenten = {"SAMK": samk, "SAMG": samg, "SAMT": samt, "SAMD": samd, "SAMM": samm, "SAMX": samx}
+        return {
+            **componenten,
+            "SAM": samk + samg + samt + samd + samm + samx,
+            "WMA6": wma6, "WMA18": wma18, "WMA35": wma35, "WMA80": wma80,
+            "DI_PLUS": di_plus, "DI_MINUS": di_minus,
+            "MACD": macd, "SIGNAL": signal, "TRIX": trix,
+        }
@@ -0,0 +1,120 @@
+# sam_sweep.py
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from advies import determine_advice
+from sam_componenten import SAM_PARAMS, evalueer
+
+# 🔬 Parameter-sweep voor SAM: een grid van parametersets doorrekenen over één of meer tickers,
+# met backtest-kengetallen per set. Per ticker worden DI, WMA's, EMA's en componenten gedeeld tussen
+# de sets (memo van sam_componenten.evalueer); tickers en blokken sets worden over processen verdeeld.
+# Alleen risk_aversion 0 hangt van SAM af (1 en 2 volgen SAT), dus daar wordt op getoetst.
+
+VOORBEELD_GRID = {
+    "wma_midden": [14, 18, 22],
+    "wma_lang": [30, 35, 40],
+    "helling": [1.001, 1.0015, 1.002],
+    "macd_snel": [8, 12],
+    "macd_traag": [21, 26],
+}
+
+
+# ✅ Grid (param -> lijst waarden) naar een lijst volledige parametersets
+def parametersets(grid):
+    namen = list(grid)
+    onbekend = [n for n in namen if n not in SAM_PARAMS]
+    if onbekend:
+        raise ValueError(f"Onbekende SAM-parameters: {onbekend}")
+    return [{**SAM_PARAMS, **dict(zip(namen, waarden))} for waarden in itertools.product(*grid.values())]
+
+
+# ✅ Backtest-kengetallen uit de uitkomst van determine_advice (één rendement per adviesgroep)
+def kengetallen(df):
+    groepen = df[df["Advies"].notna()].drop_duplicates("AdviesGroep")
+    r = groepen["SAM-%"].astype(float)
+    markt = (df["Close"].iloc[-1] - df["Close"].iloc[0]) / df["Close"].iloc[0] if len(df) else np.nan
+    if r.empty:
+        return {"Trades": 0, "SAM-% totaal": 0.0, "SAM-% samengesteld": 0.0,
+                "Succesvol-%": np.nan, "Max drawdown-%": 0.0, "Markt-%": markt * 100}
+    vermogen = (1 + r).cumprod()
+    return {
+        "Trades": len(r),
+        "SAM-% totaal": r.sum() * 100,
+        "SAM-% samengesteld": (vermogen.iloc[-1] - 1) * 100,
+        "Succesvol-%": (r > 0).mean() * 100,
+        "Max drawdown-%": min(0.0, ((vermogen / vermogen.cummax()) - 1).min()) * 100,
+        "Markt-%": markt * 100,
+    }
+
+
+# ✅ Werk per proces: één ticker, een blok parametersets, gedeelde tussenresultaten
+def _evalueer(taak):
+    ticker, df, sets, threshold = taak
+    bron = {k: df[k].to_numpy(dtype="float64")[:, None] for k in ("Open", "High", "Low", "Close")}
+    tussen = {}
+    rijen = []
+    for params in sets:
+        sam = evalueer(["SAM"], bron, params, tussen)["SAM"][:, 0]
+        advies, _ = determine_advice(
+            pd.DataFrame({"Close": bron["Close"][:, 0], "SAM": sam}, index=df.index), threshold=threshold
+        )
+        rijen.append({"Ticker": ticker, **params, **kengetallen(advies)})
+    return rijen
+
+
+# ✅ Sweep: frames = {ticker: OHLC-DataFrame}; geeft één rij per (parameterset, ticker)
+def sweep(frames, grid, threshold=2, processen=None):
+    sets = parametersets(grid)
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    processen = processen or os.cpu_count() or 1
+
+    # Genoeg taken om alle processen bezig te houden; sets van één ticker blijven zoveel mogelijk bij elkaar
+    blokken_per_ticker = max(1, -(-processen // max(len(frames), 1)))
+    grootte = max(1, -(-len(sets) // blokken_per_ticker))
+    taken = [
+        (ticker, df, sets[i:i + grootte], threshold)
+        for ticker, df in frames.items()
+        for i in range(0, len(sets), grootte)
+    ]
+
+    if processen == 1 or len(taken) == 1:
+        resultaten = [_evalueer(taak) for taak in taken]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processen, len(taken))) as pool:
+            resultaten = list(pool.map(_evalueer, taken))
+    return pd.DataFrame([rij for rijen in resultaten for rij in rijen])
+
+
+# ✅ Gemiddelde per parameterset over de tickers, beste eerst
+def samenvatting(resultaat, sorteer_op="SAM-% samengesteld"):
+    params = [k for k in SAM_PARAMS if k in resultaat.columns]
+    return (
+        resultaat.groupby(params, as_index=False)
+        .mean(numeric_only=True)
+        .sort_values(sorteer_op, ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    from koersopslag import MIN_BARS, haal_interval_bars, schoon_bars
+
+    # Gebruik: python sam_sweep.py AAPL MSFT [--interval 1d] [--period 5y]
+    # Zonder --period dezelfde historie als de app (bepaal_periode); 4h/1wk/1mo worden net als in de app
+    # lokaal afgeleid van het basisinterval, met dezelfde schoonmaak
+    argumenten = sys.argv[1:]
+    interval = argumenten.pop(argumenten.index("--interval") + 1) if "--interval" in argumenten else "1d"
+    period = argumenten.pop(argumenten.index("--period") + 1) if "--period" in argumenten else None
+    tickers = [a for a in argumenten if not a.startswith("--")] or ["AAPL"]
+
+    data = {}
+    for ticker in tickers:
+        df = schoon_bars(haal_interval_bars(ticker, interval, period))
+        if len(df) < MIN_BARS:
+            print(f"⚠️ {ticker}: slechts {len(df)} datapunten, overgeslagen", file=sys.stderr)
+            continue
+        data[ticker] = df
+    print(samenvatting(sweep(data, VOORBEELD_GRID)).head(20).to_string())
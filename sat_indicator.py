@@ -1,13 +1,9 @@
 # sat_indicator.py
-import streamlit as st
-import yfinance as yf
 import pandas as pd
-import ta
 import numpy as np
-import plotly.graph_objects as go
-from datetime import datetime, timedelta, date
-import matplotlib.pyplot as plt
-from ta.trend import ADXIndicator
+
+# 🔖 Verhoog bij elke wijziging in de berekening, zodat gedeelde cache-resultaten vervallen
+SAT_VERSIE = "1"
 
 # ✅ Helperfunctie voor veilige conversie naar float
 def safe_float(val):
@@ -16,8 +12,37 @@ def safe_float(val):
     except:
         return 0.0
 
+# ✅ Stage per bar als condition-masks; "geen duidelijke verandering" = vorige stage (forward-fill)
+# NaN telt als 0 (zoals safe_float); rij 0 blijft NaN, rij 1 start vanaf begin_stage
+def sat_stages(close, ma150, ma30, begin_stage=0.0):
+    def waarden(reeks):
+        arr = pd.to_numeric(pd.Series(reeks), errors="coerce").to_numpy(dtype="float64")
+        return np.where(np.isnan(arr), 0.0, arr)
+
+    close, ma150, ma30 = waarden(close), waarden(ma150), waarden(ma30)
+    stage = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return stage
+
+    c, m150, m30 = close[1:], ma150[1:], ma30[1:]
+    m150_prev, m30_prev = ma150[:-1], ma30[:-1]
+    nieuw = np.select(
+        [
+            ((m150 > m150_prev) & (c > m150) & (m30 > c)) | ((c > m150) & (m30 < m30_prev) & (m30 > c)),
+            (m150 < m150_prev) & (c < m150) & (c > m30) & (m30 > m30_prev),
+            (m150 > c) & (m150 > m150_prev),
+            (m150 < c) & (m150 < m150_prev) & (m30 > m30_prev),
+            (m150 > c) & (m150 < m150_prev),
+            (m150 < c) & (m150 > m150_prev) & (m30 > m30_prev),
+        ],
+        [-1.0, 1.0, -1.0, 1.0, -2.0, 2.0],
+        default=np.nan,
+    )
+    stage[1:] = pd.Series(nieuw).ffill().fillna(safe_float(begin_stage)).to_numpy()
+    return stage
+
 # ✅ Verbeterde SAT-berekening met debug en fallback
-@st.cache_data(ttl=900)
+# (gecachet per ticker/interval via indicatorcache.py)
 def calculate_sat(df):
     # ✅ Controle op MultiIndex en 'Close'-fallback
     if isinstance(df.columns, pd.MultiIndex):
@@ -28,64 +53,14 @@ def calculate_sat(df):
         if mogelijke_close:
             df["Close"] = df[mogelijke_close[0]]
         else:
+            import streamlit as st  # alleen voor de melding in de app; de berekening zelf is headless
             st.error("❌ Kon geen geldige 'Close'-kolom vinden voor SAT-berekening.")
             return df
 
     # ✅ Berekeningen
     df["MA150"] = df["Close"].rolling(window=150).mean()
     df["MA30"] = df["Close"].rolling(window=30).mean()
-    df["SAT_Stage"] = np.nan  # eerst lege kolom
-
-    for i in range(1, len(df)):
-        ma150 = safe_float(df["MA150"].iloc[i])
-        ma150_prev = safe_float(df["MA150"].iloc[i - 1])
-        ma30 = safe_float(df["MA30"].iloc[i])
-        ma30_prev = safe_float(df["MA30"].iloc[i - 1])
-        close = safe_float(df["Close"].iloc[i])
-        stage_prev = safe_float(df["SAT_Stage"].iloc[i - 1]) if i > 1 else 0.0
-        stage = stage_prev  # start met vorige stage-waarde
-
-#        if i > len(df) - 10:
-#            st.write(f"🔍 i={i} | Close={close:.2f}, MA150={ma150:.2f}, MA150_prev={ma150_prev:.2f}, MA30={ma30:.2f}, MA30_prev={ma30_prev:.2f}")
-
-        if ((ma150 > ma150_prev and close > ma150 and ma30 > close) or
-              (close > ma150 and ma30 < ma30_prev and ma30 > close)):
-            stage = -1
- #           if i > len(df) - 10:
- #               st.write(f"🔥 i={i}: Oververhitting of correctie → stage = -1")
-        
-        elif (ma150 < ma150_prev and close < ma150 and close > ma30 and ma30 > ma30_prev):
-            stage = 1
- #           if i > len(df) - 10:
- #               st.write(f"🌀 i={i}: Koers tussen MA150 en MA30, MA150 daalt → stage = 1")
-        
-        elif (ma150 > close and ma150 > ma150_prev):
-            stage = -1
-#            if i > len(df) - 10:
-#                st.write(f"😐 i={i}: MA150 stijgt, ligt boven koers → stage = -1")
-
-        elif (ma150 < close and ma150 < ma150_prev and ma30 > ma30_prev):
-            stage = 1
-  #          if i > len(df) - 10:
- #               st.write(f"🌱 i={i}: MA150 en MA30 stijgen onder koers → stage = 1")
-
-        elif (ma150 > close and ma150 < ma150_prev):
-            stage = -2
-  #          if i > len(df) - 10:
-#                st.write(f"📉 i={i}: MA150 > Close en MA150 daalt → stage = -2")
-        
-        elif (ma150 < close and ma150 > ma150_prev and ma30 > ma30_prev):
-            stage = 2
-#            if i > len(df) - 10:
-#                st.write(f"📈 i={i}: MA150 stijgt richting koers, MA30 stijgt → stage = 2")
-
-        else:
-            stage = stage_prev
-#            if i > len(df) - 10:
-#                st.write(f"⚪️ i={i}: Geen duidelijke verandering → stage = stage_prev ({stage_prev})")
-
-        df.at[df.index[i], "SAT_Stage"] = stage
-
+    df["SAT_Stage"] = sat_stages(df["Close"], df["MA150"], df["MA30"])
     df["SAT_Stage"] = df["SAT_Stage"].astype(float)
     df["SAT_Trend"] = df["SAT_Stage"].rolling(window=25).mean()
     return df
@@ -100,3 +75,17 @@ def calculate_sat(df):
 #st.write("MA30 laatste waarden:", df["MA30"].tail())
 #st.write("SAT_Stage laatste waarden:", df["SAT_Stage"].tail())    
 
+
+# ✅ SAT bijwerken nadat er bars zijn aangevuld: SAT_Stage is geldig vóór rij `vanaf`.
+# De MA's worden over de hele reeks opnieuw gerold (goedkoop en exact gelijk), de stages alleen vanaf `vanaf`.
+def vul_sat_aan(df, vanaf):
+    df["MA150"] = df["Close"].rolling(window=150).mean()
+    df["MA30"] = df["Close"].rolling(window=30).mean()
+    begin = max(vanaf - 1, 0)
+    stage = df["SAT_Stage"].to_numpy(dtype="float64", copy=True)
+    staart = sat_stages(df["Close"].iloc[begin:], df["MA150"].iloc[begin:], df["MA30"].iloc[begin:],
+                        begin_stage=stage[begin])
+    stage[begin + 1:] = staart[1:]
+    df["SAT_Stage"] = stage
+    df["SAT_Trend"] = df["SAT_Stage"].rolling(window=25).mean()
+    return df
@@ -0,0 +1,71 @@
+# symboolstatus.py
+import threading
+import time
+import pandas as pd
+
+# 🩺 Per symbool bijhouden of downloads lukken; na herhaalde fouten tijdelijk overslaan
+FOUT_DREMPEL = 3             # opeenvolgende fouten voordat een symbool geblokkeerd wordt
+BACKOFF_BASIS = 60.0         # eerste blokkade in seconden, verdubbelt bij elke volgende fout
+BACKOFF_MAX = 6 * 3600.0     # langste blokkade
+PROEF_VENSTER = 30.0         # zolang de proefpoging na een blokkade loopt, blijven anderen geblokkeerd
+
+_status = {}  # symbool -> {"fouten", "geblokkeerd_tot", "laatste_fout", "laatste_succes", "reden"}
+_lock = threading.Lock()
+
+
+def _nieuw():
+    return {"fouten": 0, "geblokkeerd_tot": 0.0, "laatste_fout": None, "laatste_succes": None, "reden": ""}
+
+
+def registreer_succes(symbool):
+    with _lock:
+        status = _status.setdefault(symbool, _nieuw())
+        status["fouten"] = 0
+        status["geblokkeerd_tot"] = 0.0
+        status["laatste_succes"] = time.time()
+
+
+def registreer_fout(symbool, reden=""):
+    with _lock:
+        status = _status.setdefault(symbool, _nieuw())
+        status["fouten"] += 1
+        status["laatste_fout"] = time.time()
+        status["reden"] = reden
+        if status["fouten"] >= FOUT_DREMPEL:
+            wacht = min(BACKOFF_MAX, BACKOFF_BASIS * 2 ** (status["fouten"] - FOUT_DREMPEL))
+            status["geblokkeerd_tot"] = time.time() + wacht
+
+
+# ✅ Na afloop van de blokkade mag er weer één poging door (half-open): de eerste aanroeper krijgt
+# het proefvenster, de rest blijft geblokkeerd tot die poging slaagt of faalt (of het venster afloopt)
+def is_geblokkeerd(symbool):
+    with _lock:
+        status = _status.get(symbool)
+        if status is None or status["fouten"] < FOUT_DREMPEL:
+            return False
+        nu = time.time()
+        if status["geblokkeerd_tot"] > nu:
+            return True
+        status["geblokkeerd_tot"] = nu + PROEF_VENSTER
+        return False
+
+
+def filter_gezond(tickers):
+    return [t for t in tickers if not is_geblokkeerd(t)]
+
+
+# ✅ Overzicht voor de UI: alleen symbolen met fouten
+def gezondheid():
+    nu = time.time()
+    with _lock:
+        rijen = [
+            {
+                "Symbool": symbool,
+                "Status": "⛔ Geblokkeerd" if s["geblokkeerd_tot"] > nu else "⚠️ Fouten",
+                "Fouten": s["fouten"],
+                "Weer proberen over (s)": max(0, int(s["geblokkeerd_tot"] - nu)),
+                "Reden": s["reden"],
+            }
+            for symbool, s in _status.items() if s["fouten"] > 0
+        ]
+    return pd.DataFrame(rijen)
@@ -0,0 +1,28 @@
+# tests/conftest.py
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# De modules staan in de hoofdmap van de repo (geen package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# ✅ Synthetische dagbars (random walk) met geldige OHLC-verhoudingen
+def _bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.standard_normal(n))
+    open_ = close + rng.standard_normal(n) * 0.5
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    index = pd.date_range("2015-01-01", periods=n, freq="D")
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": rng.integers(1, 10_000, n)},
+        index=index,
+    )
+
+
+@pytest.fixture
+def maak_bars():
+    return _bars
@@ -0,0 +1,174 @@
+# tests/test_advies.py
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+from advies import ADVIES_CATEGORIE, adviesraster, determine_advice, kies_advies
+from cachelaag import grootte_van
+from indicatorcache import _volledig
+from sam_indicator import weighted_moving_average
+
+
+# De oorspronkelijke implementatie met rij-lussen (referentie voor de gevectoriseerde versie)
+def _determine_advice_oud(df, threshold, risk_aversion=0):
+    df = df.copy()
+
+    # ✅ Trendberekening over SAM
+    df["Trend"] = weighted_moving_average(df["SAM"], 12)
+    df["TrendChange"] = df["Trend"] - df["Trend"].shift(1)
+    df["Richting"] = np.sign(df["TrendChange"])
+    df["Trail"] = 0
+    df["Advies"] = pd.Series(np.nan, index=df.index, dtype="object")  # tekstkolom, ook onder pandas 3
+
+    # ✅ Bereken Trail (opeenvolgende richting-versterking)
+    huidige_trend = 0
+    for i in range(1, len(df)):
+        huidige = df["Richting"].iloc[i]
+        vorige = df["Richting"].iloc[i - 1]
+
+        if huidige == vorige and huidige != 0:
+            huidige_trend += 1
+        elif huidige != 0:
+            huidige_trend = 1
+        else:
+            huidige_trend = 0
+
+        df.at[df.index[i], "Trail"] = huidige_trend
+
+    # ✅ Advieslogica
+    if risk_aversion == 0:
+        mask_koop = (df["Richting"] == 1) & (df["Trail"] >= threshold) & (df["Advies"].isna())
+        mask_verkoop = (df["Richting"] == -1) & (df["Trail"] >= threshold) & (df["Advies"].isna())
+
+        df.loc[mask_koop, "Advies"] = "Kopen"
+        df.loc[mask_verkoop, "Advies"] = "Verkopen"
+        df["Advies"] = df["Advies"].ffill()
+
+    elif risk_aversion == 1:
+        for i in range(2, len(df)):
+            trend_1 = df["SAT_Trend"].iloc[i]
+            trend_2 = df["SAT_Trend"].iloc[i - 1]
+            trend_3 = df["SAT_Trend"].iloc[i - 2]
+            stage_1 = df["SAT_Stage"].iloc[i]
+            stage_2 = df["SAT_Stage"].iloc[i - 1]
+            stage_3 = df["SAT_Stage"].iloc[i - 2]
+
+            if trend_1 >= trend_2 and trend_2 >= trend_3 and stage_1 > 0 and stage_2 > 0:
+                df.at[df.index[i], "Advies"] = "Kopen"
+            elif trend_1 < trend_2 and stage_1 < 0 and stage_2 < 0: # optie and trend_2 < trend_3
+                df.at[df.index[i], "Advies"] = "Verkopen"
+
+        df["Advies"] = df["Advies"].ffill()
+
+    elif risk_aversion == 2:
+        for i in range(2, len(df)):
+            trend_1 = df["SAT_Trend"].iloc[i]
+            trend_2 = df["SAT_Trend"].iloc[i - 1]
+            trend_3 = df["SAT_Trend"].iloc[i - 2]
+            stage_1 = df["SAT_Stage"].iloc[i]
+            stage_2 = df["SAT_Stage"].iloc[i - 1]
+            stage_3 = df["SAT_Stage"].iloc[i - 2]
+
+            if trend_1 > 0 and stage_1 > 0:
+                df.at[df.index[i], "Advies"] = "Kopen"
+            elif trend_1 < trend_2 and stage_1 < 0 and stage_2 < 0:
+                df.at[df.index[i], "Advies"] = "Verkopen"
+
+        df["Advies"] = df["Advies"].ffill()
+
+    # ✅ Bereken rendementen op basis van adviesgroepering
+    df["AdviesGroep"] = (df["Advies"] != df["Advies"].shift()).cumsum()
+    rendementen = []
+    sam_rendementen = []
+
+    groepen = list(df.groupby("AdviesGroep"))
+
+    for i in range(len(groepen)):
+        _, groep = groepen[i]
+        advies = groep["Advies"].iloc[0]
+
+        start = groep["Close"].iloc[0]
+        if i < len(groepen) - 1:
+            eind = groepen[i + 1][1]["Close"].iloc[0]
+        else:
+            eind = groep["Close"].iloc[-1]
+
+        try:
+            start = float(start)
+            eind = float(eind)
+            if start != 0.0:
+                markt_rendement = (eind - start) / start
+                sam_rendement = markt_rendement if advies == "Kopen" else -markt_rendement
+            else:
+                markt_rendement = 0.0
+                sam_rendement = 0.0
+        except Exception:
+            markt_rendement = 0.0
+            sam_rendement = 0.0
+
+        rendementen.extend([markt_rendement] * len(groep))
+        sam_rendementen.extend([sam_rendement] * len(groep))
+
+    if len(rendementen) != len(df):
+        raise ValueError(f"Lengte mismatch: rendementen={len(rendementen)}, df={len(df)}")
+
+    df["Markt-%"] = rendementen
+    df["SAM-%"] = sam_rendementen
+
+    if "Advies" in df.columns and df["Advies"].notna().any():
+        huidig_advies = df["Advies"].dropna().iloc[-1]
+    else:
+        huidig_advies = "Niet beschikbaar"
+
+    return df, huidig_advies
+
+
+@pytest.fixture
+def frames(maak_bars):
+    basis = _volledig(maak_bars(500))
+    met_nan = basis.copy()
+    met_nan.iloc[300:306, met_nan.columns.get_loc("SAT_Trend")] = np.nan
+    met_nan.iloc[[400, 402], met_nan.columns.get_loc("SAT_Stage")] = np.nan
+    met_nan.iloc[500:503, met_nan.columns.get_loc("SAM")] = np.nan
+    vlak = basis.copy()
+    vlak.iloc[200:230, vlak.columns.get_loc("SAM")] = 0.0  # Richting 0 → Trail 0
+    nul_close = basis.copy()
+    nul_close.iloc[450, nul_close.columns.get_loc("Close")] = 0.0
+    return {
+        "vol": basis, "nan": met_nan, "vlak": vlak, "nul_close": nul_close,
+        "kort": basis.iloc[:40], "leeg": basis.iloc[:0], "1 rij": basis.iloc[:1], "2 rijen": basis.iloc[:2],
+    }
+
+
+# De lus schrijft tekst; de gevectoriseerde versie bewaart Advies als categorie
+def _als_categorie(df):
+    return df.assign(Advies=df["Advies"].astype(ADVIES_CATEGORIE))
+
+
+# risk_aversion 1 en 2 hangen niet van de threshold af
+@pytest.mark.parametrize("risk_aversion, threshold", [(0, 1), (0, 2), (0, 3), (0, 5), (1, 2), (2, 2)])
+def test_determine_advice_gelijk_aan_lussen(frames, risk_aversion, threshold):
+    for naam, df in frames.items():
+        oud, oud_advies = _determine_advice_oud(df, threshold, risk_aversion)
+        nieuw, nieuw_advies = determine_advice(df, threshold, risk_aversion)
+        pd.testing.assert_frame_equal(nieuw, _als_categorie(oud), check_exact=True, obj=naam)
+        assert nieuw_advies == oud_advies
+
+
+def test_adviesraster_gelijk_aan_lussen(frames):
+    df = frames["nan"]
+    basis, raster = adviesraster(df)
+    for (risk_aversion, threshold) in raster:
+        oud, oud_advies = _determine_advice_oud(df, threshold, risk_aversion)
+        nieuw, nieuw_advies = kies_advies(basis, raster, risk_aversion, threshold)
+        pd.testing.assert_frame_equal(nieuw, _als_categorie(oud), check_exact=True)
+        assert nieuw_advies == oud_advies
+
+
+# Eén frame per risk_aversion 1/2 onder elke threshold telt in de cachegrootte maar één keer
+def test_rastergrootte_telt_gedeelde_frames_eenmaal(frames):
+    basis, raster = adviesraster(frames["vol"])
+    uniek = {id(frame): frame for frame in raster.values()}
+    assert len(uniek) == 5 + 1 + 1
+    verwacht = sum(grootte_van(frame) for frame in uniek.values()) + sys.getsizeof(raster)
+    assert grootte_van(raster) == verwacht
@@ -0,0 +1,42 @@
+# tests/test_cachelaag.py
+import pandas as pd
+import cachelaag
+from cachelaag import BegrensdeCache, begrensde_cache
+
+
+def _laag(monkeypatch):
+    cache = BegrensdeCache("test", 10 * 1024 * 1024)
+    monkeypatch.setitem(cachelaag._caches, "test", cache)
+    return cache
+
+
+# Een nieuwe geldigheid ververst het item onder dezelfde sleutel i.p.v. er een kopie naast te zetten
+def test_geldigheid_vervangt_item(monkeypatch):
+    cache = _laag(monkeypatch)
+    aanroepen = []
+
+    @begrensde_cache("test", geldigheid="geldig_tot")
+    def bars(ticker, interval, period, geldig_tot=None):
+        aanroepen.append(geldig_tot)
+        return pd.DataFrame({"Close": [float(geldig_tot)]})
+
+    for geldig_tot in (100, 100, 200, 300, 300):
+        assert bars("AAA", "1d", "20y", geldig_tot)["Close"].iloc[0] == geldig_tot
+    assert aanroepen == [100, 200, 300]
+    assert len(cache.items) == 1
+
+    # Positioneel of als keyword: zelfde sleutel
+    bars("AAA", "1d", period="20y", geldig_tot=300)
+    assert aanroepen == [100, 200, 300]
+
+
+# Een mislukte (lege) uitkomst wordt niet bewaard
+def test_lege_uitkomst_niet_gecachet(monkeypatch):
+    cache = _laag(monkeypatch)
+
+    @begrensde_cache("test", geldigheid="geldig_tot")
+    def leeg(ticker, geldig_tot=None):
+        return pd.DataFrame()
+
+    assert leeg("AAA", 1).empty
+    assert len(cache.items) == 0
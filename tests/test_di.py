@@ -0,0 +1,95 @@
+# tests/test_di.py
+import numpy as np
+import pytest
+from ta.trend import ADXIndicator
+from di_indicator import DIStaat, di_panel, di_reeks
+
+
+def _ta_di(df):
+    adx = ADXIndicator(df["High"], df["Low"], df["Close"], window=14, fillna=True)
+    return adx.adx_pos().to_numpy(), adx.adx_neg().to_numpy()
+
+
+def _per_bar(df):
+    staat = DIStaat(14)
+    rijen = [staat.update(h, l, c) for h, l, c in zip(df["High"], df["Low"], df["Close"])]
+    return np.array([r[0] for r in rijen]), np.array([r[1] for r in rijen])
+
+
+# 15 bars: alles nog opvulling (0); 16 bars: de eerste Wilder-stap
+@pytest.mark.parametrize("n", [15, 16, 17, 300])
+def test_di_reeks_gelijk_aan_ta(maak_bars, n):
+    df = maak_bars(n)
+    plus, minus = di_reeks(df["High"], df["Low"], df["Close"])
+    ta_plus, ta_minus = _ta_di(df)
+    np.testing.assert_array_equal(plus, ta_plus)
+    np.testing.assert_array_equal(minus, ta_minus)
+
+
+# NaN in de startperiode (andere startsom) en verderop (NaN propageert, daarna ffill)
+def test_di_reeks_nan_highs_gelijk_aan_ta(maak_bars):
+    df = maak_bars(400)
+    df.iloc[[3, 100, 101, 250], df.columns.get_loc("High")] = np.nan
+    plus, minus = di_reeks(df["High"], df["Low"], df["Close"])
+    ta_plus, ta_minus = _ta_di(df)
+    np.testing.assert_array_equal(plus, ta_plus)
+    np.testing.assert_array_equal(minus, ta_minus)
+
+
+@pytest.mark.parametrize("n", [1, 15, 16, 300])
+@pytest.mark.parametrize("met_nan", [False, True])
+def test_distaat_update_gelijk_aan_di_reeks(maak_bars, n, met_nan):
+    df = maak_bars(n)
+    if met_nan and n > 100:
+        df.iloc[[3, 100], df.columns.get_loc("High")] = np.nan
+    plus, minus = _per_bar(df)
+    reeks_plus, reeks_minus = di_reeks(df["High"], df["Low"], df["Close"])
+    np.testing.assert_array_equal(plus, reeks_plus)
+    np.testing.assert_array_equal(minus, reeks_minus)
+
+
+# uit_reeks (vectorpass) geeft dezelfde toestand als update per bar: verder updaten blijft gelijk
+@pytest.mark.parametrize("n", [15, 16, 300])
+def test_distaat_uit_reeks_gelijk_aan_update(maak_bars, n):
+    df = maak_bars(n + 20)
+    h, l, c = (df[k].to_numpy() for k in ("High", "Low", "Close"))
+    staat = DIStaat.uit_reeks(h[:n], l[:n], c[:n], 14)
+    vervolg = [staat.update(float(h[i]), float(l[i]), float(c[i])) for i in range(n, n + 20)]
+    reeks_plus, reeks_minus = di_reeks(h, l, c)
+    np.testing.assert_array_equal([v[0] for v in vervolg], reeks_plus[n:])
+    np.testing.assert_array_equal([v[1] for v in vervolg], reeks_minus[n:])
+
+
+# Panel: elke kolom (met eigen startpunt) gelijk aan di_reeks op de eigen historie
+def test_di_panel_gelijk_aan_di_reeks_per_kolom(maak_bars):
+    lengtes = [0, 1, 15, 16, 17, 250, 400]
+    n = max(lengtes)
+    frames = [maak_bars(n, seed=j) for j in range(len(lengtes))]
+    high, low, close = (np.column_stack([f[k].to_numpy() for f in frames]) for k in ("High", "Low", "Close"))
+    for j, lengte in enumerate(lengtes):
+        high[:n - lengte, j] = low[:n - lengte, j] = close[:n - lengte, j] = np.nan
+    high[300, 6] = np.nan
+
+    plus, minus = di_panel(high, low, close)
+    for j, lengte in enumerate(lengtes):
+        s = n - lengte
+        np.testing.assert_array_equal(plus[:s, j], 0.0)
+        reeks_plus, reeks_minus = di_reeks(high[s:, j], low[s:, j], close[s:, j])
+        np.testing.assert_array_equal(plus[s:, j], reeks_plus)
+        np.testing.assert_array_equal(minus[s:, j], reeks_minus)
+
+
+# Meerdere NaN in de opwarmperiode: de startsom reikt dan voorbij bar 15. Elke update is gelijk aan
+# di_reeks over de historie tot en met die bar
+def test_distaat_update_met_nan_in_opwarming(maak_bars):
+    df = maak_bars(60)
+    df.iloc[[2, 5, 9], df.columns.get_loc("High")] = np.nan
+    df.iloc[[4], df.columns.get_loc("Low")] = np.nan
+    plus, minus = _per_bar(df)
+    for i in range(len(df)):
+        deel = df.iloc[:i + 1]
+        reeks_plus, reeks_minus = di_reeks(deel["High"], deel["Low"], deel["Close"])
+        assert (plus[i], minus[i]) == (reeks_plus[-1], reeks_minus[-1])
+    ta_plus, ta_minus = _ta_di(df)
+    np.testing.assert_array_equal(plus[30:], ta_plus[30:])  # na de opwarming ook gelijk aan ta
+    np.testing.assert_array_equal(minus[30:], ta_minus[30:])
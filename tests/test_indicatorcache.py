@@ -0,0 +1,96 @@
+# tests/test_indicatorcache.py
+import numpy as np
+import pandas as pd
+import cachelaag
+import indicatorcache
+import sam_componenten
+from indicatorcache import _volledig, indicatoren
+
+
+# De laatst opgeslagen bar is nog herzien (vormende bar) en er zijn bars bijgekomen
+def _met_nieuwe_bars(df, oud, nieuw):
+    df.iloc[oud - 1, df.columns.get_loc("Close")] += 0.3
+    df.iloc[oud - 1, df.columns.get_loc("High")] += 0.3
+    return df.iloc[:nieuw].copy()
+
+
+def _tel_aanvullingen(monkeypatch):
+    aanroepen = []
+    origineel = indicatorcache._aanvullen
+
+    def teller(*args):
+        aanroepen.append(args)
+        return origineel(*args)
+
+    monkeypatch.setattr(indicatorcache, "_aanvullen", teller)
+    return aanroepen
+
+
+# Het incrementele pad (SamStroom + vul_sat_aan) geeft hetzelfde als volledig herberekenen
+def test_aanvullen_gelijk_aan_volledig(maak_bars, monkeypatch):
+    aanroepen = _tel_aanvullingen(monkeypatch)
+    df = maak_bars(700)
+    indicatoren("TEST-AANVUL", "1d", df.iloc[:600])
+    for oud, nieuw in ((600, 640), (640, 641), (641, 700)):
+        deel = _met_nieuwe_bars(df, oud, nieuw)
+        pd.testing.assert_frame_equal(indicatoren("TEST-AANVUL", "1d", deel), _volledig(deel), check_exact=True)
+    assert len(aanroepen) == 3
+
+
+# Met een vervangen component of andere SAM_PARAMS kent SamStroom de regels niet: volledig herberekenen
+def test_aangepast_register_rekent_volledig(maak_bars, monkeypatch):
+    aanroepen = _tel_aanvullingen(monkeypatch)
+    knoop = dict(sam_componenten.REGISTER["SAMX"], bereken=lambda p, trix, trix_prev: np.zeros_like(trix))
+    monkeypatch.setitem(sam_componenten.REGISTER, "SAMX", knoop)
+    monkeypatch.setitem(sam_componenten.SAM_PARAMS, "helling", 1.002)
+    assert not sam_componenten.is_standaard()
+
+    df = maak_bars(700)
+    indicatoren("TEST-REGISTER", "1d", df.iloc[:600])
+    deel = _met_nieuwe_bars(df, 600, 650)
+    resultaat = indicatoren("TEST-REGISTER", "1d", deel)
+
+    assert aanroepen == []
+    pd.testing.assert_frame_equal(resultaat, _volledig(deel), check_exact=True)
+    assert (resultaat["SAMX"] == 0).all()
+
+
+def test_standaardregister_na_herstel():
+    assert sam_componenten.is_standaard()
+
+
+class _GeheugenBackend:
+    def __init__(self):
+        self.data = {}
+
+    def haal(self, sleutel):
+        return self.data.get(sleutel)
+
+    def zet(self, sleutel, data):
+        self.data[sleutel] = data
+
+
+# Een andere replica (lege LRU, zelfde gedeelde backend) krijgt de uitkomst uit de gedeelde laag
+def test_gedeelde_backend_tussen_replicas(maak_bars, monkeypatch):
+    monkeypatch.setattr(cachelaag, "_gedeeld", _GeheugenBackend())
+    df = maak_bars(300)
+    eerste = indicatoren("TEST-GEDEELD", "1d", df)
+
+    indicatorcache._cache.wis()
+    monkeypatch.setattr(indicatorcache, "_volledig", lambda df: None)  # herberekenen mag niet meer nodig zijn
+    hits = indicatorcache._cache.gedeelde_hits
+    pd.testing.assert_frame_equal(indicatoren("TEST-GEDEELD", "1d", df), eerste, check_exact=True)
+    assert indicatorcache._cache.gedeelde_hits == hits + 1
+
+
+# App (met vormende bar) en scanner (alleen gesloten bars) in één proces: beide blijven incrementeel
+def test_app_en_scanner_eigen_item(maak_bars, monkeypatch):
+    aanroepen = _tel_aanvullingen(monkeypatch)
+    df = maak_bars(620)
+    for n in (600, 610, 620):
+        indicatoren("TEST-SCANNER", "1d", df.iloc[:n])
+        indicatoren("TEST-SCANNER", "1d", df.iloc[: n - 1], gesloten=True)
+    monkeypatch.setattr(indicatorcache, "_volledig", lambda df: None)
+    resultaat = indicatoren("TEST-SCANNER", "1d", df.iloc[:619], gesloten=True)
+    assert len(aanroepen) == 4
+    assert len(resultaat) == 619
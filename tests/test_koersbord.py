@@ -0,0 +1,49 @@
+# tests/test_koersbord.py
+import pandas as pd
+import pytest
+import koersbord
+
+TICKERS = {"AAA": "Aaa", "BBB": "Bbb"}
+
+
+@pytest.fixture
+def bord(monkeypatch):
+    monkeypatch.setattr(koersbord, "_koersen", {})
+    monkeypatch.setattr(koersbord, "_tickers", set())
+    monkeypatch.setattr(koersbord, "_thread", object())  # geen achtergrondthread in de test
+    monkeypatch.setattr(koersbord, "is_markt_open", lambda ticker: False)
+
+    pogingen = []
+
+    def haal_op(tickers, interval, period=None):
+        pogingen.append(list(tickers))
+        if len(pogingen) == 1:
+            raise TimeoutError("429")
+        koers = pd.DataFrame({"Open": [10.0], "Close": [11.0]})
+        return {t: koers for t in tickers}
+
+    monkeypatch.setattr(koersbord, "haal_op", haal_op)
+    return pogingen
+
+
+# Mislukt de eerste download terwijl de markt dicht is, dan probeert de volgende rerun het opnieuw
+def test_mislukte_eerste_download_bij_gesloten_markt(bord):
+    koersbord.registreer_markt(TICKERS)
+    assert koersbord.lees_markt(TICKERS) == []
+
+    koersbord.registreer_markt(TICKERS)
+    assert len(bord) == 2
+    assert [r[0] for r in koersbord.lees_markt(TICKERS)] == ["AAA", "BBB"]
+
+    # Alles binnen en de markt dicht: geen nieuwe downloads meer
+    koersbord.registreer_markt(TICKERS)
+    koersbord._ververs_ronde()
+    assert len(bord) == 2
+
+
+# De achtergrondronde haalt ontbrekende koersen ook buiten handelstijd op
+def test_verversronde_vult_ontbrekende_koersen(bord):
+    koersbord.registreer_markt(TICKERS)
+    koersbord._ververs_ronde()
+    assert sorted(bord[-1]) == ["AAA", "BBB"]
+    assert len(koersbord.lees_markt(TICKERS)) == 2
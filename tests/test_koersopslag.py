@@ -0,0 +1,65 @@
+# tests/test_koersopslag.py
+import pandas as pd
+import pytest
+import koersopslag
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def opslag(tmp_path, monkeypatch):
+    monkeypatch.setattr(koersopslag, "OPSLAG_MAP", str(tmp_path))
+    monkeypatch.setattr(koersopslag, "_geldig_tot", {})
+    downloads = []
+    antwoorden = []
+
+    def download_bars(ticker, interval, period=None, start=None):
+        downloads.append("delta" if start is not None else period)
+        return antwoorden.pop(0) if antwoorden else pd.DataFrame()
+
+    monkeypatch.setattr(koersopslag, "download_bars", download_bars)
+    return downloads, antwoorden
+
+
+def _recente_bars(maak_bars, n=100):
+    df = maak_bars(n)
+    df.index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=n, freq="D")
+    return df
+
+
+# Een lege delta (rate limit) houdt de opgeslagen bars en downloadt niet de hele periode
+def test_lege_delta_houdt_opslag(opslag, maak_bars):
+    downloads, antwoorden = opslag
+    df = _recente_bars(maak_bars)
+    koersopslag.schrijf_bars("AAA", "1d", df)
+
+    resultaat = koersopslag.haal_bars("AAA", "1d", "20y")
+    assert downloads == ["delta"]
+    pd.testing.assert_frame_equal(resultaat, df, check_freq=False)
+    assert not koersopslag.is_vers("AAA", "1d")  # volgende ronde probeert de delta opnieuw
+
+
+# Geen of kapotte opslag → volledige periode
+def test_kapotte_opslag_haalt_volledige_periode(opslag, maak_bars):
+    downloads, antwoorden = opslag
+    df = _recente_bars(maak_bars)
+    with open(koersopslag.opslag_pad("AAA", "1d"), "wb") as f:
+        f.write(b"geen parquet")
+    antwoorden.append(df)
+
+    resultaat = koersopslag.haal_bars("AAA", "1d", "20y")
+    assert downloads == ["20y"]
+    assert len(resultaat) == len(df)
+
+
+# Opslag ouder dan de periode (15m na weken stilstand): de volledige periode vervangt die
+def test_verouderde_opslag_haalt_volledige_periode(opslag, maak_bars):
+    downloads, antwoorden = opslag
+    oud = maak_bars(50)  # 2015
+    koersopslag.schrijf_bars("AAA", "15m", oud)
+    nieuw = _recente_bars(maak_bars, 20)
+    antwoorden.append(nieuw)
+
+    resultaat = koersopslag.haal_bars("AAA", "15m", "30d")
+    assert downloads == ["30d"]
+    assert len(resultaat) == len(nieuw)
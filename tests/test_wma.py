@@ -0,0 +1,32 @@
+# tests/test_wma.py
+import numpy as np
+import pandas as pd
+import pytest
+from sam_indicator import weighted_moving_average
+
+
+# De oorspronkelijke implementatie (rolling.apply met een lambda per bar)
+def _wma_oud(series, window):
+    weights = np.arange(1, window + 1)
+    return series.rolling(window).apply(lambda x: np.dot(x, weights)/weights.sum(), raw=True)
+
+
+@pytest.mark.parametrize("window", [6, 12, 18, 35, 80])
+def test_wma_gelijk_aan_rolling_apply(maak_bars, window):
+    close = maak_bars(1500)["Close"]
+    close.iloc[[40, 41, 700]] = np.nan  # vensters met NaN blijven NaN
+
+    oud, nieuw = _wma_oud(close, window), weighted_moving_average(close, window)
+
+    assert nieuw.index.equals(close.index)
+    assert nieuw.name == close.name
+    np.testing.assert_array_equal(nieuw.isna().to_numpy(), oud.isna().to_numpy())
+    # Alleen de optelvolgorde verschilt (np.dot tegenover vaste volgorde)
+    np.testing.assert_allclose(nieuw.to_numpy(), oud.to_numpy(), rtol=1e-13, atol=0)
+
+
+@pytest.mark.parametrize("lengte", [0, 1, 5, 6])
+def test_wma_korte_reeks(lengte):
+    close = pd.Series(np.arange(lengte, dtype="float64") + 1.0)
+    oud, nieuw = _wma_oud(close, 6), weighted_moving_average(close, 6)
+    np.testing.assert_allclose(nieuw.to_numpy(), oud.to_numpy(), rtol=1e-13, atol=0)